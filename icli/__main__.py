@@ -94,6 +94,10 @@ Environment Variables:
   ICLI_IBKR_PORT       - Gateway port (default: 4001)
   ICLI_CLIENT_ID       - Client ID for this session
   ICLI_REFRESH         - Toolbar refresh rate in seconds (default: 3.33)
+  ICLI_REFRESH_SHARE   - Max CPU share for toolbar rendering before slowing refreshes (default: 0.10)
+  ICLI_REFRESH_MAX     - Slowest toolbar refresh rate in seconds (default: 30)
+  ICLI_QUALIFY_RATE    - Max contract lookups per second (default: 40)
+  ICLI_DEAD_CONTRACT_TTL - Seconds before retrying contracts IBKR can't find (default: 300)
         """
     )
 
@@ -1,8 +1,11 @@
+import asyncio
 import os
 import time
 from dataclasses import dataclass, field
+from typing import Any
 
 import httpx
+from cachetools import LRUCache, TLRUCache
 from loguru import logger
 
 # Use very small timeouts because we expect to be operating locally.
@@ -26,12 +29,15 @@ class AwwdioClient:
 
     async def say(
         self, voice: str = "Alex", say: str = "Hello World", speed: int = 250, **kwargs
-    ) -> None:
+    ) -> bool:
+        """Speak 'say' and return True if the server accepted the request."""
         try:
             await self.client.get(
                 f"{self.url}/say",
                 params=dict(voice=voice, say=say, speed=speed, prio=-100, **kwargs),
             )
+
+            return True
         except Exception as e:
             # Get current time
             now = time.time()
@@ -45,8 +51,144 @@ class AwwdioClient:
                 # Reset last error time for this message
                 self.errorHistory[say] = now
 
+            return False
+
     async def sound(self, sound: str = "blip") -> None:
         try:
             await self.client.get(f"{self.url}/play", params=dict(sound=sound))
         except Exception:
             logger.warning("Sound failed to send!")
+
+
+@dataclass(slots=True)
+class AlertCounts:
+    """Lifetime counts of what happened to alerts for one alert key."""
+
+    queued: int = 0
+    suppressed: int = 0
+    dropped: int = 0
+    expired: int = 0
+    delivered: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class AlertBus:
+    """Deliver spoken alerts from one worker instead of creating a task per alert.
+
+    Producers (usually running inside ticker update callbacks) call .say() which only
+    suppresses or enqueues the alert, then .run() drains the queue using the persistent
+    AwwdioClient connection with at most 'concurrency' requests in flight.
+
+    Alerts for the same key are suppressed locally for their 'suppress' window, so repeating
+    alerts (e.g. a price bouncing across a level) don't generate any work beyond a counter.
+
+    Keys usually include prices, so suppression entries expire with their window and counts
+    are only kept for the most recently used 'keep' keys.
+    """
+
+    speak: AwwdioClient
+
+    # maximum number of concurrent requests to the speaking server
+    concurrency: int = 4
+
+    # maximum number of undelivered alerts before we start dropping new alerts
+    limit: int = 1_000
+
+    # maximum number of keys to keep counts for
+    keep: int = 4_096
+
+    queue: asyncio.Queue[tuple[str, dict[str, Any]]] = field(init=False)
+
+    # key -> timestamp when suppression of the most recently accepted alert ends (removed once it ends)
+    suppressed: TLRUCache[str, float] = field(init=False)
+
+    # key -> counts of alert outcomes
+    counts: LRUCache[str, AlertCounts] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.limit)
+        self.suppressed = TLRUCache(
+            maxsize=self.keep, ttu=lambda _key, until, _now: until, timer=time.time
+        )
+        self.counts = LRUCache(maxsize=self.keep)
+
+    def countsFor(self, key: str) -> AlertCounts:
+        if (counts := self.counts.get(key)) is None:
+            counts = self.counts[key] = AlertCounts()
+
+        return counts
+
+    def say(
+        self,
+        say: str,
+        suppress: float = 0,
+        key: str | None = None,
+        deadline: float | None = None,
+        **kwargs,
+    ) -> bool:
+        """Queue 'say' for speaking unless the same key was queued within the last 'suppress' seconds.
+
+        'key' defaults to the spoken content. If 'deadline' is provided, the alert is discarded
+        instead of spoken if it can't be delivered before the deadline.
+
+        Returns True if the alert was queued."""
+        # no server configured means there's nowhere to deliver anything
+        if not self.speak.url:
+            return False
+
+        key = key or say
+        counts = self.countsFor(key)
+
+        if suppress and key in self.suppressed:
+            counts.suppressed += 1
+            return False
+
+        # also forward 'suppress' so the server can de-duplicate across multiple clients
+        params = dict(say=say, **kwargs)
+        if suppress:
+            params["suppress"] = suppress
+
+        if deadline:
+            params["deadline"] = deadline
+
+        try:
+            self.queue.put_nowait((key, params))
+        except asyncio.QueueFull:
+            counts.dropped += 1
+            return False
+
+        if suppress:
+            self.suppressed[key] = time.time() + suppress
+
+        counts.queued += 1
+        return True
+
+    async def deliver(self, key: str, params: dict[str, Any]) -> None:
+        counts = self.countsFor(key)
+
+        if (deadline := params.get("deadline")) and time.time() > deadline:
+            counts.expired += 1
+            return
+
+        if await self.speak.say(**params):
+            counts.delivered += 1
+        else:
+            counts.failed += 1
+
+    async def run(self) -> None:
+        """Deliver queued alerts forever."""
+        while True:
+            # wait for at least one alert, then also collect anything else already waiting (up to our concurrency limit)
+            batch = [await self.queue.get()]
+            while len(batch) < self.concurrency and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                await asyncio.gather(*[self.deliver(k, p) for k, p in batch])
+            except Exception:
+                logger.exception("Alert delivery failed?")
+
+    def report(self) -> dict[str, AlertCounts]:
+        """Return alert counts for every key we still track, sorted by key."""
+        return dict(sorted(self.counts.items()))
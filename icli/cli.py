@@ -14,10 +14,10 @@ import os
 import pathlib
 import re
 import shutil
-import statistics
 import sys
+import time
 import warnings
-from collections import defaultdict
+from collections import Counter, defaultdict
 from collections.abc import Mapping, Sequence
 from dataclasses import asdict, dataclass, field
 from fractions import Fraction
@@ -62,7 +62,7 @@ import tradeapis.cal as mcal
 import tradeapis.ifthen as ifthen
 import tradeapis.ifthen_templates as ifthen_templates
 import tradeapis.orderlang as orderlang
-from cachetools import TTLCache, cached
+from cachetools import LRUCache, TTLCache, cached
 from ib_async import (
     IB,
     Bag,
@@ -180,7 +180,19 @@ def mkPctColor(a, b):
     return mkcolor(a, b, colorRanges)
 
 
-@cached(cache={}, key=lambda x, _y: x.conId)
+def toolbarPaused(fn):
+    """Decorate an IBKRCmdlineApp coroutine method so the toolbar doesn't refresh while it runs."""
+
+    @functools.wraps(fn)
+    async def paused(self, *args, **kwargs):
+        with self.toolbarGovernor.pausing():
+            return await fn(self, *args, **kwargs)
+
+    return paused
+
+
+@memoized
+@cached(cache=LRUCache(maxsize=4096), key=lambda x, _y: x.conId, info=True)
 def sortLeg(leg, conIdCache):
     try:
         return (
@@ -195,10 +207,10 @@ def sortLeg(leg, conIdCache):
         return ("Z", leg.action, 0)
 
 
-# Note: only cache based on the 'x' argument and not the 'contractCache' argument.
-@cached(cache={}, key=lambda x, _y: hash(x))
 def sortQuotes(x, contractCache: dict[int, Contract] | None = None):
-    """Comparison function to sort quotes by specific types we want grouped together."""
+    """Comparison function to sort quotes by specific types we want grouped together.
+
+    (Only runs once per quote when the quote is added to our QuoteIndex, so it isn't memoized.)"""
     sym, quote = x
     c = quote.contract
 
@@ -302,7 +314,8 @@ def invertstr(x):
 
 
 # allow these values to be cached for 10 hours
-@cached(cache=TTLCache(maxsize=200, ttl=60 * 90))
+@memoized
+@cached(cache=TTLCache(maxsize=200, ttl=60 * 90), info=True)
 def marketCalendar(start, stop):
     return mcal.getMarketCalendar(
         "NASDAQ",
@@ -312,9 +325,10 @@ def marketCalendar(start, stop):
 
 
 # allow these values to be cached for 10 hours
-@cached(cache=TTLCache(maxsize=300, ttl=60 * 60 * 10))
-def fetchDateTimeOfEndOfMarketDayAtDate(y, m, d):
-    """Return the market (start, end) timestamps for the next two market end times."""
+@memoized
+@cached(cache=TTLCache(maxsize=300, ttl=60 * 60 * 10), info=True)
+def fetchEpochsOfMarketDaysAtDate(y, m, d):
+    """Return the market (start, end) epoch timestamps for the next two market days starting at date."""
     start = pd.Timestamp(y, m, d, tz="US/Eastern")  # type: ignore
     found = marketCalendar(start, start + pd.Timedelta(7, "D"))
 
@@ -325,7 +339,10 @@ def fetchDateTimeOfEndOfMarketDayAtDate(y, m, d):
     nextStart = found.iat[1, 0]
     nextEnd = found.iat[1, 1]
 
-    return [(soonestStart, soonestEnd), (nextStart, nextEnd)]
+    return [
+        (soonestStart.timestamp(), soonestEnd.timestamp()),
+        (nextStart.timestamp(), nextEnd.timestamp()),
+    ]
 
 
 def goodCalendarDate():
@@ -344,7 +361,8 @@ def goodCalendarDate():
     return now
 
 
-@cached(cache=TTLCache(maxsize=1, ttl=60 * 90))
+@memoized
+@cached(cache=TTLCache(maxsize=1, ttl=60 * 90), info=True)
 def tradingDaysRemainingInMonth():
     """Return how many trading days until the month ends...
 
@@ -363,7 +381,8 @@ def tradingDaysRemainingInMonth():
     return distance - 1
 
 
-@cached(cache=TTLCache(maxsize=1, ttl=60 * 90))
+@memoized
+@cached(cache=TTLCache(maxsize=1, ttl=60 * 90), info=True)
 def tradingDaysRemainingInYear():
     """Return how many trading days until the year ends..."""
     now = goodCalendarDate()
@@ -376,7 +395,8 @@ def tradingDaysRemainingInYear():
     return distance - 1
 
 
-@cached(cache=TTLCache(maxsize=20, ttl=60 * 90))
+@memoized
+@cached(cache=TTLCache(maxsize=20, ttl=60 * 90), info=True)
 def tradingDaysNextN(days: int):
     """Return calendar dates for the next N trading days"""
     now = goodCalendarDate()
@@ -387,33 +407,22 @@ def tradingDaysNextN(days: int):
     return list(found["market_open"])
 
 
-# expire this cache once every 15 minutes so we only have up to 15 minutes of wrong dates after EOD
-@cached(cache=TTLCache(maxsize=128, ttl=60 * 15))
-def fetchEndOfMarketDayAtDate(y, m, d):
-    """Return the timestamp of the next end-of-day market timestamp.
-
-    This is currently only used for showing the "end of day" countdown timer in the toolbar,
-    so it's okay if we return an expired date for a little while (the 15 minute cache interval),
-    so the toolbar will just report a negative closing time for up to 15 minutes.
+def fetchEndOfMarketDayAtDate(y, m, d) -> float:
+    """Return the epoch timestamp of the next end-of-day market close on or after the date.
 
-    The cache structure is because the toolbar refresh code is called anywhere from 1 to 10 times
-    _per second_ so we want to minimize as much math and logic overhead as possible for non-changing
-    values.
-
-    We could potentially place an event timer somewhere to manually clear the cache at EOD,
-    but we just aren't doing it yet."""
-    [(soonestStart, soonestEnd), (nextStart, nextEnd)] = (
-        fetchDateTimeOfEndOfMarketDayAtDate(y, m, d)
+    This is used for showing "time until expiration" in the toolbar for every option row, so the
+    calendar lookup is cached and the only per-call work is comparing the close against the current time.
+    """
+    [(_soonestStart, soonestEnd), (_nextStart, nextEnd)] = (
+        fetchEpochsOfMarketDaysAtDate(y, m, d)
     )
 
     # this logic just helps us across the "next day" barrier when this runs right after a normal 4pm close
     # so we immediately start ticking down until the next market day close (which could be 3-4 days away depending on holidays!)
-    if soonestEnd.timestamp() > whenever.ZonedDateTime.now("US/Eastern").timestamp():
-        return whenever.ZonedDateTime.from_timestamp(
-            soonestEnd.timestamp(), tz="US/Eastern"
-        )
+    if soonestEnd > time.time():
+        return soonestEnd
 
-    return whenever.ZonedDateTime.from_timestamp(nextEnd.timestamp(), tz="US/Eastern")
+    return nextEnd
 
 
 # Fields updated live for toolbar printing.
@@ -532,6 +541,22 @@ class IBKRCmdlineApp:
     # (more frequent updates requires higher CPU utilization for the faster redrawing)
     toolbarUpdateInterval: float = 2.22
 
+    # stretches the toolbar refresh interval beyond 'toolbarUpdateInterval' when rendering is expensive or the event loop is busy
+    toolbarGovernor: ToolbarGovernor = field(init=False)
+
+    # number of seconds between coalesced ticker processing passes.
+    # 0 processes every ticker update immediately when IBKR delivers it. Anything higher only marks
+    # updated tickers as dirty, then processes each dirty ticker once per interval, so CPU usage is
+    # bounded by our quote count instead of by IBKR's tick rate.
+    tickerInterval: float = field(
+        default_factory=lambda: float(os.getenv("ICLI_TICKER_INTERVAL", 0))
+    )
+
+    # if enabled, symbols referenced by ifthen predicates bypass the coalescing interval and process on every tick
+    tickerImmediatePredicates: bool = field(
+        default_factory=lambda: bool(int(os.getenv("ICLI_TICKER_IMMEDIATE", 0)))
+    )
+
     host: str = "127.0.0.1"
     port: int = 4001
 
@@ -559,12 +584,19 @@ class IBKRCmdlineApp:
     # same as 'updates' except this resets to 0 if your session gets disconnected then reconnected
     updatesReconnect: int = 0
 
+    # toolbar quote rows from the previous refresh as: symbol -> (ITicker, render key, render second, row)
+    # (rows only re-render when their render key changes; rows showing elapsed times also re-render every new second)
+    toolbarRows: dict[str, tuple[ITicker, tuple, int | None, str | None]] = field(
+        default_factory=dict
+    )
+
     now: whenever.ZonedDateTime = field(
         default_factory=lambda: whenever.ZonedDateTime.now("US/Eastern")
     )
     nowpy: datetime.datetime = field(default_factory=lambda: datetime.datetime.now())
 
-    quotesPositional: list[tuple[str, ITicker]] = field(default_factory=list)
+    # live quotes in toolbar display order (maintained by quoteAdd() and quoteRemove())
+    quoteIndex: QuoteIndex = field(default_factory=QuoteIndex)
     dispatch: cmds.Dispatch = field(default_factory=cmds.Dispatch)
 
     # holder for background events being run for some purpose
@@ -591,10 +623,22 @@ class IBKRCmdlineApp:
 
     # State caches
     quoteState: dict[str, ITicker] = field(default_factory=dict)
+
+    # current market session open/close times (shared by everything comparing against market hours)
+    sessionClock: SessionClock = field(default_factory=SessionClock)
+
+    # EMA state for every ITicker in quoteState (each ITicker owns one row of the store)
+    emaStore: TWEMAStore = field(
+        default_factory=lambda: TWEMAStore(series=len(TICKER_EMA_SERIES))
+    )
+
     contractIdsToQuoteKeysMappings: dict[int, str] = field(default_factory=dict)
     depthState: dict[Contract, Ticker] = field(default_factory=dict)
     summary: dict[str, float] = field(default_factory=dict)
     pnlSingle: dict[int, PnLSingle] = field(default_factory=dict)
+
+    # our positions by contract id (kept current from portfolio and position events)
+    positionOverlay: PositionOverlay = field(init=False)
     exiting: bool = False
 
     # cache some parsers. yes these names are confusing. sorry.
@@ -604,6 +648,56 @@ class IBKRCmdlineApp:
     # global ifthenRuntime for all data processing and predicate execution
     ifthenRuntime: ifthen.IfThenRuntime = field(default_factory=ifthen.IfThenRuntime)
 
+    # quote keys used by ifthen predicates (refreshed when predicates change, see ifthenSymbolsRefresh())
+    ifthenSymbols: set[str] = field(default_factory=set)
+
+    # set when predicates change (commands, or predicates firing) so the ticker processor refreshes predicate symbols
+    predicatesDirty: bool = True
+    predicatesRefresh: asyncio.Task | None = None
+
+    # set when quotes or alert levels change so the ticker processor refreshes toolbar and alert indicator demand
+    # (display preset changes are detected by comparing against 'indicatorsPreset')
+    indicatorsDirty: bool = True
+    indicatorsPreset: str | None = None
+
+    # latest ticker for each quote key updated since the last coalesced ticker pass
+    tickersDirty: dict[str, Ticker] = field(default_factory=dict)
+
+    # perf_counter_ns() when the oldest entry in 'tickersDirty' arrived
+    tickersDirtySince: int = 0
+
+    # tick-to-action latency histograms (tick arrival -> processing -> predicate firing -> order placement)
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+
+    # contract qualification requests run as concurrent paced batches (IBKR limits us to ~50 API messages per second)
+    qualifier: ContractQualifier = field(init=False)
+
+    # contracts IBKR recently failed to resolve, so repeated lookups fail fast instead of asking again
+    deadContracts: NegativeCache = field(default_factory=NegativeCache)
+
+    # which optional indicators (ATRs, quote flow, history, EMAs) each consumer needs per quote key.
+    # Tickers only update indicators somebody demands (refreshed on every ticker processor pass).
+    indicatorDemand: IndicatorDemand = field(default_factory=IndicatorDemand)
+
+    # shared predicate data values (one slot per distinct symbol/field/timeframe, fetched once per ticker processing pass)
+    extractorTable: ExtractorTable = field(default_factory=ExtractorTable)
+
+    # if enabled, predicate checks run on a worker thread using snapshots of predicate inputs
+    # instead of running on the event loop during ticker processing
+    predicateWorkerEnabled: bool = field(
+        default_factory=lambda: bool(int(os.getenv("ICLI_PREDICATE_WORKER", 0)))
+    )
+
+    predicateWorker: PredicateWorker | None = None
+
+    # parsed plans for commands run repeatedly (predicate actions), by command text
+    commandPlans: LRUCache[str, CommandPlan] = field(
+        default_factory=lambda: LRUCache(maxsize=512)
+    )
+
+    # 'commandPlans' lookups as {"hits": N, "misses": N}
+    commandPlansInfo: Counter[str] = field(default_factory=Counter)
+
     # maps of tempalte names to template executor instances. We have one executor per "template type"
     # we then sub-populate with more concrete symbol/algo details so we can run one template multiple
     # times with different arugments (i.e. multiple symbols trading under the same tempalte logic, etc)
@@ -651,6 +745,9 @@ class IBKRCmdlineApp:
 
     speak: awwdio.AwwdioClient = field(default_factory=awwdio.AwwdioClient)
 
+    # spoken alerts from quote processing are queued here and delivered by one background worker
+    alerts: awwdio.AlertBus = field(init=False)
+
     # Specific dict of ONLY fields we show in the live account status toolbar.
     # Saves us from sorting/filtering self.summary() with every full bar update.
     accountStatus: dict[str, float] = field(
@@ -660,9 +757,9 @@ class IBKRCmdlineApp:
     )
 
     # Cache all contractIds and names to their fully qualified contract object values
-    # TODO: replace this with our dual in-memory-disk-passthrough cache.
-    conIdCache: diskcache.Cache = field(
-        default_factory=lambda: diskcache.Cache("./cache-contracts")
+    # (hot contracts are served from memory; everything is also persisted to disk as compact records)
+    conIdCache: ContractCache = field(
+        default_factory=lambda: ContractCache(diskcache.Cache("./cache-contracts"))
     )
 
     connected: bool = False
@@ -767,6 +864,22 @@ class IBKRCmdlineApp:
         # provide ourself to instrumentdb so it can also use live API calls
         self.idb = instrumentdb.IInstrumentDatabase(self)
 
+        self.alerts = awwdio.AlertBus(self.speak)
+
+        self.toolbarGovernor = ToolbarGovernor(self.toolbarUpdateInterval)
+
+        self.positionOverlay = PositionOverlay(self.accountId)
+
+        self.qualifier = ContractQualifier(
+            self.ib,
+            Pacer(float(os.getenv("ICLI_QUALIFY_RATE", 40))),
+            self.latency,
+            self.deadContracts,
+        )
+
+        if self.predicateWorkerEnabled:
+            self.predicateWorker = PredicateWorker(self.ifthenRuntime)
+
     def setupLogging(self) -> None:
         # Configure logger where the ib_insync live service logs get written.
         # Note: if you have weird problems you don't think are being exposed
@@ -926,6 +1039,9 @@ class IBKRCmdlineApp:
             # then we don't look it up again.
             if cached_contract and cached_contract.conId:
                 # logger.info("Found in cache: {} for {}", cached_contract, contract)
+                # (copy because callers may modify returned contracts (like setting exchanges for orders),
+                #  but cached contracts in memory are shared by every reader)
+                cached_contract = copy.copy(cached_contract)
                 cached_contracts[cached_contract.conId] = cached_contract
                 totalResult[id(contract)] = cached_contract
             else:
@@ -957,63 +1073,30 @@ class IBKRCmdlineApp:
             return [totalResult[id(c)] for c in contracts]
 
         # For uncached, fetch them from the IBKR lookup system
-        got = []
-        try:
-            # logger.info("Looking up uncached contracts: {}", uncached_contracts)
-
-            # Ensure all contracts have an exchange set; default to SMART if not specified
-            # This provides a fallback routing for contracts that don't explicitly set an exchange
-            for (originalContractKey, contract) in uncached_contracts:
-                if not contract.exchange:
-                    contract.exchange = "SMART"
+        # logger.info("Looking up uncached contracts: {}", uncached_contracts)
 
-            # iterate requests in smaller blocks if we have a large input request
-            CHUNK = 50
+        # Ensure all contracts have an exchange set; default to SMART if not specified
+        # This provides a fallback routing for contracts that don't explicitly set an exchange
+        for originalContractKey, contract in uncached_contracts:
+            if not contract.exchange:
+                contract.exchange = "SMART"
 
-            # Note: "Bag" contracts can NEVER be qualified, so don't ever try them (avoid a timeout wait if bags are attempted)
-            for block in range(0, len(uncached_contracts), CHUNK):
-                # logger.info("CHECKING: {}", pp.pformat(uncached_contracts))
-                logger.info(
-                    "Qualifying {} contracts from {} to {}...",
-                    len(uncached_contracts),
-                    block,
-                    block + CHUNK,
-                )
-                got.extend(
-                    await asyncio.wait_for(
-                        self.ib.qualifyContractsAsync(
-                            *[
-                                c
-                                for (k, c) in uncached_contracts[block : block + CHUNK]
-                            ],
-                            returnAll=True,
-                        ),
-                        timeout=min(
-                            6, 2 * len(uncached_contracts[block : block + CHUNK])
-                        ),
-                    )
-                )
+        # Note: "Bag" contracts can NEVER be qualified, so don't ever try them (avoid a timeout wait if bags are attempted)
+        # (the qualifier merges lookups for the same contract across concurrent qualify() calls, so we key
+        #  lookups by the contract id or descriptor plus the exchange and currency we asked about)
+        # If qualification fails (timeout during nightly maintenance, etc), results are None and we return
+        # the original unqualified contracts so we can attempt to continue.
+        lookups = [
+            (self.deadContracts.key(contract), contract)
+            for _, contract in uncached_contracts
+        ]
 
-            # logger.info("Got: {}", got)
-        except Exception as e:
-            logger.error(
-                "Timeout while trying to qualify {} contracts (sometimes IBKR is slow or the API is offline during nightly restarts) :: {}",
-                len(uncached_contracts),
-                str(e),
-            )
+        # a manual refresh also retries contracts we recently failed to find
+        if overwrite:
+            for key, _ in lookups:
+                self.deadContracts.discard(key)
 
-        # If qualification failed (timeout during nightly maintenance, etc), fill missing contracts
-        # with their original unqualified versions so we can attempt to continue
-        if len(got) != len(uncached_contracts):
-            logger.warning(
-                "Qualification incomplete: got {} contracts but expected {}. Using unqualified contracts for missing entries.",
-                len(got),
-                len(uncached_contracts),
-            )
-            # Fill in missing contracts with original unqualified versions
-            for i in range(len(got), len(uncached_contracts)):
-                (_, original_contract) = uncached_contracts[i]
-                got.append(original_contract)
+        got = await self.qualifier.qualify(lookups)
 
         # iterate resolved contracts and cache them by multiple lookup keys
         for (originalContractKey, requestContract), contract in zip(
@@ -1058,7 +1141,9 @@ class IBKRCmdlineApp:
             #  to return _all_ contracts back to the user in the order of their inputs, so
             #  we need every input contract to be in the 'totalResult' map regardless of its final
             #  success/fail resolution value)
-            totalResult[id(contract)] = contract
+            # (map from the _request_ contract because results shared from concurrent requests for the same
+            #  contract are copies of the other request's contract)
+            totalResult[id(requestContract)] = contract
 
             if type(contract) == Contract:
                 # Convert generic 'Contract' to its actual underlying type for proper storage and future retrieval
@@ -1185,11 +1270,18 @@ class IBKRCmdlineApp:
                     #       (e.g. Monday after hours, our 0dte is tuesday, but calendar tuesday is 1 day away, so 1 dte == wednesday)
                     val = ((now + Week(weekday=weekday)) - now).days  # type: ignore
 
+            # ticker processing interval is stored directly since it's read on every ticker update
+            if key.lower() == "tickerinterval":
+                self.tickerInterval = float(val)
+
             self.localvars[key] = val
         else:
             # else, if value not provided, remove key
             self.localvars.pop(key, None)
 
+            if key.lower() == "tickerinterval":
+                self.tickerInterval = 0
+
         if original and not val:
             logger.info("UNSET: {} (previously: {})", key, original)
         elif original:
@@ -1208,7 +1300,7 @@ class IBKRCmdlineApp:
         If no input quantity, return total position size.
         If input quantity larger than position size, returned size is capped to max position size.
         """
-        portitems = self.ib.portfolio()
+        portitems = self.positionOverlay.rows.values()
         # logger.debug("Current Portfolio is: {}", portitems)
 
         results = []
@@ -1722,6 +1814,7 @@ class IBKRCmdlineApp:
 
         return profitOrder, lossOrder
 
+    @toolbarPaused
     async def placeOrderForContract(
         self,
         sym: str,
@@ -2230,6 +2323,12 @@ class IBKRCmdlineApp:
             await self.contractForOrderSide(order, contract), order
         )
 
+        # if this order came from a predicate action, record how long it took since the triggering tick
+        if stamps := TICK_STAMP.get():
+            received, fired = stamps
+            placed = self.latency.record("fired:order", fired)
+            self.latency.record("tick:order", received, placed)
+
         limitRecord = TradeOrder(trade, order)
 
         profitTrade = None
@@ -3301,6 +3400,7 @@ class IBKRCmdlineApp:
 
         Note: positions are always SINGLE contracts (i.e. you will never get a Bag contract here).
         """
+        self.positionOverlay.position(position)
 
         # TODO: re-evaluate if we actually need this? It doesn't work on startup since we moved
         #       this here instead of in the order notification system. Maybe these _are_ subscribed
@@ -3582,11 +3682,19 @@ class IBKRCmdlineApp:
                     )
 
                     assert datafield
-                    fetcher = self.dataExtractorForTicker(
-                        iticker, datafield, timeframe or 0
-                    )
 
-                    extractor.datafetcher = fetcher
+                    # all predicates reading the same field share one slot in our extractor table
+                    # (algo fields don't depend on the symbol, so they share one slot for all symbols)
+                    source = 0 if "." in datafield else id(iticker)
+                    extractor.datafetcher = self.extractorTable.compile(
+                        (source, datafield, timeframe or 0),
+                        functools.partial(
+                            self.dataExtractorForTicker,
+                            iticker,
+                            datafield,
+                            timeframe or 0,
+                        ),
+                    )
 
             # now do the same for functions (if any)
             fnfetcher: (
@@ -3616,6 +3724,110 @@ class IBKRCmdlineApp:
                 )
                 fn.datafetcher = fnfetcher
 
+    async def predicatesRun(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run 'fn' (anything using ifthenRuntime) and return its result.
+
+        With the predicate worker enabled, 'fn' runs on the worker thread between predicate checks
+        instead of on the event loop, so it never overlaps checks and the event loop never waits on them."""
+        if self.predicateWorker:
+            return await self.predicateWorker.call(fn, *args, **kwargs)
+
+        return fn(*args, **kwargs)
+
+    def predicateInputs(self) -> list[tuple[frozenset[str], list[tuple[str, Any]]]]:
+        """Return (symbols, [(datafield, datafetcher), ...]) for each active predicate (run with predicatesRun())."""
+        return [
+            (
+                frozenset(predicate.symbols or ()),
+                [(e.datafield, e.datafetcher) for e in predicate.extractors()],
+            )
+            for prepredicate in self.ifthenRuntime.predicates.values()
+            for predicate in prepredicate.actives
+        ]
+
+    async def ifthenSymbolsRefresh(self) -> None:
+        """Collect quote keys of all symbols used by ifthen predicates for the immediate ticker processing lane.
+
+        Also declares which indicators active predicates read from each of their symbols, frees extractor
+        table slots no predicate reads anymore, and records which slots predicate worker snapshots capture.
+
+        Run this after adding, activating, or removing predicates so new predicates have snapshot data on
+        their first checks."""
+        self.predicatesDirty = False
+
+        inputs = await self.predicatesRun(self.predicateInputs)
+
+        ifthenSymbols: set[str] = set()
+        demand: dict[str, set[str]] = defaultdict(set)
+        used: set[int] = set()
+        reads: dict[str, set[int]] = defaultdict(set)
+        table = self.extractorTable
+        for symbols, extractors in inputs:
+            ifthenSymbols |= symbols
+
+            indicators = set()
+            slots = set()
+            for datafield, fetcher in extractors:
+                if datafield:
+                    indicators |= self.indicatorsForDatafield(datafield)
+
+                if isinstance(fetcher, ExtractorSlot) and fetcher.table is table:
+                    try:
+                        slots.add(fetcher.current())
+                    except Exception:
+                        logger.exception("[{}] Extractor has no data?", datafield)
+
+            used |= slots
+            for symbol in symbols:
+                demand[symbol] |= indicators
+                reads[symbol] |= slots
+
+        self.ifthenSymbols = ifthenSymbols
+        self.indicatorDemand.declare("ifthen", demand)
+        self.indicatorsDirty = True
+
+        # removed predicates (and predicates set up again after reconnecting or re-adding quotes) leave
+        # slots nobody reads, so free them instead of holding their tickers forever
+        # (and predicate worker snapshots only capture slots read by predicates of updated quotes)
+        # Note: the worker never modifies the table and only reads slot versions, so this doesn't need to wait for checks.
+        table.retain(used)
+        table.reads = {k: frozenset(v) for k, v in reads.items()}
+
+    def indicatorsForDatafield(self, field: str) -> set[str]:
+        """Return which optional ITicker indicators the dataExtractorForTicker() fetcher for 'field' reads."""
+        # algo fields read from the algo binder and not from tickers
+        if "." in field:
+            return set()
+
+        match field.lower():
+            case "atr":
+                return {"atrs"}
+            case "vwap":
+                return {"ema"}
+            case "upspeed" | "downspeed" | "uplen" | "downlen":
+                return {"quoteflow"}
+            case parts if ":" in parts:
+                return {EMA_SOURCES.get(parts.split(":")[0], "ema")}
+
+        return set()
+
+    def indicatorDemandRefresh(self) -> None:
+        """Declare indicators needed by the toolbar and alerts, then enable/disable ticker indicators to match all demand."""
+        preset = display_config.quote_preset
+        self.indicatorsDirty = False
+        self.indicatorsPreset = preset
+
+        toolbar: dict[str, frozenset[str]] = {}
+        alerts: dict[str, frozenset[str]] = {}
+        for symkey, iticker in self.quoteState.items():
+            c = iticker.ticker.contract
+            toolbar[symkey] = toolbarIndicators(c, preset)
+            alerts[symkey] = alertIndicators(c, bool(iticker.levels))
+
+        self.indicatorDemand.declare("toolbar", toolbar)
+        self.indicatorDemand.declare("alerts", alerts)
+        self.indicatorDemand.apply(self.quoteState)
+
     def dataExtractorForTicker(self, iticker: ITicker, field: str, timeframe: int):
         """Return a zero-argument function querying the live 'iticker' for 'field' and potentially 'timeframe' updates."""
         fetcher = None
@@ -3628,31 +3840,21 @@ class IBKRCmdlineApp:
 
             assert self.algobinder
 
+            # record which paths we read (for subscription filtering, if enabled)
+            self.algobinder.track(field)
+
             # Note: it's up to the user ensuring a 100% correct algo field description for the full 3, 5, 8+ level depth they expect...
-            return lambda *args: self.algobinder.read(field)
+            return self.algobinder.compile(field)
 
         def emaByField(subtype):
             parts = subtype.split(":")
 
             # match first component to the instance variable names of ITicker
-            match parts[0]:
-                case "price" | "p":
-                    src = "ema"
-                case "trade" | "tr":
-                    src = "emaTradeRate"
-                case "volume" | "vol":
-                    src = "emaVolumeRate"
-                case "iv":
-                    src = "emaIV"
-                case "delta" | "d":
-                    src = "emaDelta"
-                case "vega" | "v":
-                    src = "emaVega"
-                case _:
-                    src = "ema"
-                    logger.warning(
-                        "No EMA source provided, defaulting to 'price' (other choices: 'delta' or 'iv' or 'vega' or 'trade' or 'volume')"
-                    )
+            if not (src := EMA_SOURCES.get(parts[0])):
+                src = "ema"
+                logger.warning(
+                    "No EMA source provided, defaulting to 'price' (other choices: 'delta' or 'iv' or 'vega' or 'trade' or 'volume')"
+                )
 
             # fetch ITicker instance variable by name
             base: TWEMA = getattr(iticker, src)
@@ -3727,17 +3929,18 @@ class IBKRCmdlineApp:
 
                 contractId = c.conId
                 mul = float(c.multiplier or 1)
-                accountReader = self.ib.wrapper.portfolio[self.accountId]
-                fetcher = lambda *args: accountReader[
-                    contractId
-                ].averageCost / math.copysign(accountReader[contractId].position, mul)
+                positions = self.positionOverlay.rows
+                fetcher = lambda *args: (
+                    positions[contractId].averageCost
+                    / math.copysign(positions[contractId].position, mul)
+                )
             case "qty":
                 # fetch live qty for position as reported by portfolio reporting
                 assert iticker.ticker.contract
 
                 contractId = iticker.ticker.contract.conId
-                accountReader = self.ib.wrapper.portfolio[self.accountId]
-                fetcher = lambda *args: accountReader[contractId].position
+                positions = self.positionOverlay.rows
+                fetcher = lambda *args: positions[contractId].position
             case "theta" | "delta" | "iv" | "gamma" | "d" | "g" | "t" | "v" | "vega":
                 # allow some shorthand back to actual property names
                 match field:
@@ -3753,6 +3956,13 @@ class IBKRCmdlineApp:
                         field = "vega"
 
                 fetcher = lambda *args: getattr(iticker.modelGreeks, field)
+            case "upspeed" | "downspeed" | "uplen" | "downlen":
+                # quote flow breach stats where 'timeframe' is the price range
+                # (e.g. 'upspeed' of 3 is average seconds for bids to rise $3 above previous asks)
+                flowfield = field.lower()
+                fetcher = lambda *args: iticker.quoteflow.analyze().get(
+                    flowfield, {}
+                ).get(timeframe)
             case parts if ":" in parts:
                 fetcher = emaByField(parts)
             case _:
@@ -3766,9 +3976,12 @@ class IBKRCmdlineApp:
 
         We don't technically need this to receive ticker updates since tickers are "live updated" in their
         own classes for reading, but we _do_ use this to calculate live metadata, reporting, or quote-based
-        algo triggers (though, we could also run our own timer-based system to update once per second instead
-        of running once per tick... TODO: do that instead so we run one fix-up loop maybe every 500ms to 750ms
-        instead of running this callback function 200 times per second across all our symbols).
+        algo triggers.
+
+        If 'tickerInterval' is set, we only mark updated tickers as dirty here, then tickersProcessor() runs
+        one processing pass for all dirty tickers every 'tickerInterval' seconds instead of running full
+        processing 200 times per second across all our symbols. Symbols used by ifthen predicates can still be
+        processed on every tick if 'tickerImmediatePredicates' is enabled.
 
         This method should always be clean and fast because it runs up to 100+ times per second depending on how
         many tickers you are subscribed to in your client.
@@ -3778,13 +3991,152 @@ class IBKRCmdlineApp:
                    isn't working correctly because then you can see the errors/exceptions (if any).
         """
         # logger.info("Ticker update: {}", tickr)
+        received = time.perf_counter_ns()
+
+        if self.tickerInterval > 0:
+            immediate = []
+            immediateSymbols = (
+                self.ifthenSymbols if self.tickerImmediatePredicates else ()
+            )
+
+            for ticker in tickr:
+                quotekey = lookupKey(ticker.contract)
+                if quotekey in immediateSymbols:
+                    immediate.append(ticker)
+                else:
+                    # only the most recent update matters because tickers are live-updated in place anyway
+                    if not self.tickersDirty:
+                        self.tickersDirtySince = received
+
+                    self.tickersDirty[quotekey] = ticker
+
+            if immediate:
+                self.tickersProcess(immediate, received)
+        else:
+            self.tickersProcess(tickr, received)
 
+        if ICLI_DUMP_QUOTES:
+            with open(
+                f"tickers-{datetime.datetime.now().date()}-{self.clientId}.json", "ab"
+            ) as tj:
+                for ticker in tickr:
+                    c = ticker.contract
+                    tj.write(
+                        ourjson.dumps(
+                            dict(
+                                symbol=(c.localSymbol or c.symbol).replace(" ", ""),
+                                time=str(ticker.time),
+                                bid=ticker.bid,
+                                bidSize=ticker.bidSize,
+                                ask=ticker.ask,
+                                askSize=ticker.askSize,
+                                volume=ticker.volume,
+                            )
+                        )
+                    )
+                    tj.write(b"\n")
+
+    def predicateResultsHandle(self, quotekey: str, results, received: int) -> None:
+        """Schedule commands for successful predicates (and report failed predicates) from checking 'quotekey'."""
+        for successCmd in results:
+            match successCmd:
+                case ifthen.IfThenRuntimeSuccess(pid=predicateId, cmd=cmd, predicate=p):
+                    # successful predicates may have activated or deactivated predicates
+                    self.predicatesDirty = True
+
+                    # we have a COMMAND TO RUN so SCHEDULE TO RUN A COMMAND at the next event loop wakeup
+                    logger.info("Predicate Complete: {}", pp.pformat(p))
+                    logger.info(
+                        "[{}] Predicate scheduling command: {}", predicateId, cmd
+                    )
+                    # the command task inherits our tick timestamps so order placement can report full latency
+                    fired = self.latency.record("tick:fired", received)
+                    stamp = TICK_STAMP.set((received, fired))
+
+                    # predicates can fire repeatedly, so only parse their commands once
+                    try:
+                        self.task_create(
+                            f"[{predicateId}] predicate command execution",
+                            self.buildAndRun(
+                                self.commandPlan(cmd) if isinstance(cmd, str) else cmd
+                            ),
+                        )
+                    finally:
+                        TICK_STAMP.reset(stamp)
+                case ifthen.IfThenRuntimeError(pid=predicateId, err=e):
+                    logger.warning(
+                        "[{} :: [predicateId {}]] Check failed for predicate: {}",
+                        quotekey,
+                        predicateId,
+                        str(e),
+                    )
+
+    async def predicateResultsProcessor(self):
+        """Handle predicate check results from the predicate worker thread."""
+        assert self.predicateWorker
+        results = self.predicateWorker.results
+        while not self.exiting:
+            received, checked = await results.get()
+            for quotekey, successes in checked:
+                try:
+                    self.predicateResultsHandle(quotekey, successes, received)
+                except Exception:
+                    logger.exception("[{}] Predicate result handling failed?", quotekey)
+
+    async def tickersProcessor(self):
+        """Run coalesced ticker processing for all dirty tickers every 'tickerInterval' seconds."""
+        while not self.exiting:
+            # if coalescing is disabled, just check again later in case it gets enabled
+            await asyncio.sleep(self.tickerInterval or 1)
+
+            # refresh which symbols belong in the immediate lane after predicates fired (which activates and
+            # deactivates predicates), in the background because it may wait for running predicate checks
+            if self.predicatesDirty and (
+                not self.predicatesRefresh or self.predicatesRefresh.done()
+            ):
+                self.predicatesRefresh = asyncio.create_task(
+                    self.ifthenSymbolsRefresh()
+                )
+
+            # refresh which indicators each ticker needs to update after quotes, alerts, or display settings changed
+            if (
+                self.indicatorsDirty
+                or self.indicatorsPreset != display_config.quote_preset
+            ):
+                self.indicatorDemandRefresh()
+
+            if not self.tickersDirty:
+                continue
+
+            dirty = self.tickersDirty
+            self.tickersDirty = {}
+
+            try:
+                self.tickersProcess(dirty.values(), self.tickersDirtySince)
+            except Exception:
+                logger.exception("Ticker processing failed?")
+
+    def tickersProcess(self, tickr, received: int = 0):
+        """Update live metadata, alerts, and predicate checks for each ticker in 'tickr'.
+
+        'received' is the perf_counter_ns() when the (oldest) update in 'tickr' arrived for latency tracking."""
+        received = received or time.perf_counter_ns()
+
+        # Ticker updates run in two passes so every EMA of every updated ticker is calculated in one
+        # vectorized step between them (instead of each ticker looping its own EMAs one at a time):
+        #   - first pass: update non-EMA ticker state and stage EMA updates into the EMA store
+        #   - apply all staged EMA updates at once
+        #   - second pass: run EMA-dependent alerts, predicate checks, and everything else per ticker
+        # Bags are staged after everything else so they use greeks and synthetic quotes refreshed from
+        # this pass of leg updates (each bag refreshes once no matter how many of its legs updated).
+        staged: list[tuple[Ticker, str, ITicker, float | None]] = []
+        bags: list[tuple[Ticker, str, ITicker]] = []
         for ticker in tickr:
             c = ticker.contract
             quotekey = lookupKey(c)
 
             try:
-                # Note: we run the processTickerUpdate() before the "no bid or ask" check because some
+                # Note: we run the ticker update before the "no bid or ask" check because some
                 #       symbols like VIF/VIX/VIN and TICK-NYSE and TRIN-NYSE have 'last' values but no bid/ask on them,
                 #       but we still want to process their 'last' price updates for EMA trending and alerting.
                 iticker = self.quoteState[quotekey]
@@ -3795,29 +4147,36 @@ class IBKRCmdlineApp:
                 # logger.warning("Ticker update for non-existing quote: {}", quotekey)
                 continue
 
-            iticker.processTickerUpdate()
+            if isinstance(c, Bag):
+                bags.append((ticker, quotekey, iticker))
+                continue
 
-            for successCmd in self.ifthenRuntime.check(quotekey):
-                match successCmd:
-                    case ifthen.IfThenRuntimeSuccess(
-                        pid=predicateId, cmd=cmd, predicate=p
-                    ):
-                        # we have a COMMAND TO RUN so SCHEDULE TO RUN A COMMAND at the next event loop wakeup
-                        logger.info("Predicate Complete: {}", pp.pformat(p))
-                        logger.info(
-                            "[{}] Predicate scheduling command: {}", predicateId, cmd
-                        )
-                        self.task_create(
-                            f"[{predicateId}] predicate command execution",
-                            self.buildAndRun(cmd),
-                        )
-                    case ifthen.IfThenRuntimeError(pid=predicateId, err=e):
-                        logger.warning(
-                            "[{} :: [predicateId {}]] Check failed for predicate: {}",
-                            quotekey,
-                            predicateId,
-                            str(e),
-                        )
+            staged.append((ticker, quotekey, iticker, iticker.stageTickerUpdate()))
+
+        for *_, iticker, _ in staged:
+            for bag in iticker.bags:
+                bag.refreshLegs()
+
+        for ticker, quotekey, iticker in bags:
+            staged.append((ticker, quotekey, iticker, iticker.stageTickerUpdate()))
+
+        self.emaStore.apply()
+        self.latency.record("tick:staged", received)
+
+        # predicate values fetched during this pass are valid for the entire pass
+        self.extractorTable.advance()
+
+        worker = self.predicateWorker
+        for ticker, quotekey, iticker, current in staged:
+            c = ticker.contract
+
+            if current is not None:
+                iticker.completeTickerUpdate(current)
+
+            if not worker:
+                self.predicateResultsHandle(
+                    quotekey, self.ifthenRuntime.check(quotekey), received
+                )
 
             if ticker.bid is None or ticker.ask is None:
                 continue
@@ -3849,7 +4208,14 @@ class IBKRCmdlineApp:
             # update method isn't a coroutine itself...
             # logger.info("[{}] Checking grabbers: {}", ticker.contract.conId, grabbers)
             # (this doesn't work for Bag because Bag has underlying symbols but spread prices so we can't compare "name vs. price")
-            name = (c.localSymbol or c.symbol).replace(" ", "")
+
+        # hand off predicate checks for updated predicate symbols to the worker thread
+        if worker and (
+            keys := [key for _, key, _, _ in staged if key in self.ifthenSymbols]
+        ):
+            worker.submit(keys, self.extractorTable.capture(keys), received)
+
+        self.latency.record("tick:processed", received)
 
         # TODO: we could also run volume crossover calculations too...
 
@@ -3869,26 +4235,6 @@ class IBKRCmdlineApp:
 
         #   need to track previous bid/ask to determine when prices are moving for/against us
 
-        if ICLI_DUMP_QUOTES:
-            with open(
-                f"tickers-{datetime.datetime.now().date()}-{self.clientId}.json", "ab"
-            ) as tj:
-                for ticker in tickr:
-                    tj.write(
-                        ourjson.dumps(
-                            dict(
-                                symbol=name,
-                                time=str(ticker.time),
-                                bid=ticker.bid,
-                                bidSize=ticker.bidSize,
-                                ask=ticker.ask,
-                                askSize=ticker.askSize,
-                                volume=ticker.volume,
-                            )
-                        )
-                    )
-                    tj.write(b"\n")
-
     def updateSummary(self, v):
         """Each row is populated after connection then continually
         updated via subscription while the connection remains active."""
@@ -4079,10 +4425,18 @@ class IBKRCmdlineApp:
                 self.task_create("Send Account Update Payload", sendUpdate())
 
     def bottomToolbar(self):
+        start = time.perf_counter()
+        try:
+            return self.bottomToolbarRender()
+        finally:
+            self.toolbarGovernor.rendered(time.perf_counter() - start)
+
+    def bottomToolbarRender(self):
         self.updates += 1
         self.updatesReconnect += 1
         self.now = whenever.ZonedDateTime.now("US/Eastern")
         self.nowpy = self.now.py_datetime()
+        nowts = time.time()
 
         def fmtPrice2(n: float):
             # Some prices may not be populated if they haven't
@@ -4114,8 +4468,14 @@ class IBKRCmdlineApp:
         useLast = self.localvars.get("last")
         hideSingleLegs = self.localvars.get("hide")
         hideMissing = self.localvars.get("hidemissing")
+        positions = self.positionOverlay
+
+        # formatTicker() sets this if the row it generated depends on the current time (or is waiting for data)
+        # instead of depending only on ticker data, so the row can't be reused after the current second.
+        rowVolatile = False
 
         def formatTicker(c):
+            nonlocal rowVolatile
             ls = lookupKey(c.contract)
 
             # Get position information for this contract if it exists
@@ -4123,13 +4483,11 @@ class IBKRCmdlineApp:
             position_cost = 0.0
             has_position = False
             try:
-                contractId = c.contract.conId
-                accountReader = self.ib.wrapper.portfolio[self.accountId]
-                if contractId in accountReader:
-                    position_qty = accountReader[contractId].position
+                if row := positions.get(c.contract.conId):
+                    position_qty = row.position
                     # Get average cost per contract from IBKR
                     # Note: IBKR's averageCost is always per-contract cost (see helpers.py:2223)
-                    position_cost = accountReader[contractId].averageCost
+                    position_cost = row.averageCost
                     # For options, convert from per-contract to per-share cost
                     if isinstance(c.contract, (Option, FuturesOption)):
                         multiplier = float(c.contract.multiplier or 1)
@@ -4187,6 +4545,7 @@ class IBKRCmdlineApp:
                 try:
                     # NOTE: decimals *can* be zero, so our decimal fetcher returns None on failure to load, so None means "wait for data to populate"
                     if (decimals := self.idb.decimals(c.contract)) is None:
+                        rowVolatile = True
                         return f"WAITING TO POPULATE METADATA FOR: {c.contract.localSymbol}"
 
                     # for DISPLAY purposes, don't allow one digit decimals (things like /RTY trade in $0.1 increments, but we still want to show $0.10 values)
@@ -4196,6 +4555,7 @@ class IBKRCmdlineApp:
 
                 except Exception as e:
                     # logger.exception("WHY?")
+                    rowVolatile = True
                     return f"METADATA LOOKUP FAILED {e}, WAITING TO TRY AGAIN FOR: {c.contract.localSymbol}"
 
             # assert decimals >= 0, f"Why bad decimals here for {c.contract}?"
@@ -4217,12 +4577,14 @@ class IBKRCmdlineApp:
                 if hideMissing:
                     return None
 
+                rowVolatile = True
                 return f"WAITING FOR LIVE MARKET DATA: {name:>12}  ::  {bid=} x {bidSize=}  {ask=} x {askSize=}  {last=} {close=} {usePrice=} {high=} {low=}"
 
             if usePrice is None:
                 if hideMissing:
                     return None
 
+                rowVolatile = True
                 return f"WAITING FOR DATA UPDATE: {c.contract.localSymbol}"
 
             if c.lastTimestamp:
@@ -4343,6 +4705,8 @@ class IBKRCmdlineApp:
                 # For all combos, we cache the ID to original symbol mapping
                 # after the contractId is resolved.
                 if c.contract.comboLegs:
+                    # spread rows always show quote age
+                    rowVolatile = True
                     legsAdjust = len(c.contract.comboLegs) / 2
 
                     # generate rows to look like:
@@ -4424,27 +4788,21 @@ class IBKRCmdlineApp:
                     # typically, a low stddev indicates temporary low volatility which is
                     # the calm before the storm when a big move happens next (in either direction,
                     # but direction prediction can be augmented with moving average crossovers).
+                    # (history maintains its own running statistics, so these are all just reads)
                     try:
-                        std = statistics.stdev(src)
+                        std = src.stdev()
                     except:
                         std = 0
 
                     try:
                         parts: list[str | float] = [
-                            round(x, 2)
-                            for x in statistics.quantiles(
-                                src,
-                                n=5,
-                                method="inclusive",
-                            )
+                            round(x, 2) for x in src.quantiles(n=5)
                         ]
 
-                        # TODO: benchmark if this double min/max run is faster than looping over it once and just
-                        #       checking for min/max in one loop instead of two loops here.
-                        minmax = max(src) - min(src)
+                        minmax = src.range
                     except:
                         # 'statistics' throws an exception if there's not enough data points yet...
-                        parts = sorted(src)
+                        parts = list(src.ordered)
                         minmax = 0
 
                     # add marker where curent price goes in this range...
@@ -4644,9 +5002,8 @@ class IBKRCmdlineApp:
 
                     # Note: this dynamic calendar math shows the exact time remaining even accounting for (pre-scheduled) early market close days.
                     when = (
-                        fetchEndOfMarketDayAtDate(2000 + int(y), int(m), int(d))
-                        - self.now
-                    ).in_days_of_24h()
+                        fetchEndOfMarketDayAtDate(2000 + int(y), int(m), int(d)) - nowts
+                    ) / 86400
 
                     # this may be too wide for some people? works for me.
                     # just keep shrinking your terminal font size until everything fits?
@@ -4721,6 +5078,10 @@ class IBKRCmdlineApp:
                     # Use display_config to determine which fields to show
                     quote_mode = display_config.quote_preset
 
+                    # everything except the smallest presets shows time until expiration (or quote age)
+                    if quote_mode not in {"minimal", "compact", "scalping"}:
+                        rowVolatile = True
+
                     # Calculate common price display
                     mark_price = fmtPriceOpt(mark or (c.modelGreeks.optPrice if c.modelGreeks else 0))
                     spread_price = fmtPriceOpt((ask or np.nan) - mark, decimals)
@@ -5045,6 +5406,37 @@ class IBKRCmdlineApp:
             return " ".join(fields)
             # fmt: on
 
+        # Rows only depend on their ticker data, their position, and our display settings, so we only
+        # re-render rows when one of those changed since the previous refresh (or if the row is volatile
+        # and a new second started). Otherwise, a refresh re-uses the previous formatted row as-is.
+        rowSettings = (
+            display_config.quote_preset,
+            useLast,
+            hideSingleLegs,
+            hideMissing,
+        )
+        rowSecond = int(nowts)
+        rowsPrevious = self.toolbarRows
+        rowsCurrent: dict[str, tuple[ITicker, tuple, int | None, str | None]] = {}
+
+        def renderTicker(sym: str, c: ITicker) -> str | None:
+            nonlocal rowVolatile
+            key = (c.revision, rowSettings, positions.get(c.contract.conId))
+            prev = rowsPrevious.get(sym)
+            if (
+                prev
+                and prev[0] is c
+                and prev[1] == key
+                and prev[2] in {None, rowSecond}
+            ):
+                rowsCurrent[sym] = prev
+                return prev[3]
+
+            rowVolatile = False
+            row = formatTicker(c)
+            rowsCurrent[sym] = (c, key, rowSecond if rowVolatile else None, row)
+            return row
+
         try:
             rowlen, _ = shutil.get_terminal_size()
 
@@ -5177,7 +5569,7 @@ class IBKRCmdlineApp:
             ordcount = len(self.ib.openTrades())
             openorders = f"open orders: {ordcount:,}"
 
-            positioncount = len(self.ib.portfolio())
+            positioncount = len(self.positionOverlay)
             openpositions = f"positions: {positioncount:,}"
 
             executioncount = len(self.ib.fills())
@@ -5185,11 +5577,8 @@ class IBKRCmdlineApp:
 
             # TODO: We couold also flip this between a "time until market open" vs "time until close" value depending
             #       on if we are out of market hours or not, but we aren't bothering with the extra logic for now.
-            untilClose = (
-                fetchEndOfMarketDayAtDate(self.now.year, self.now.month, self.now.day)
-                - self.now
-            )
-            todayclose = f"mktclose: {convert_time(untilClose.in_seconds())}"
+            untilClose = self.sessionClock.update(nowts).close - nowts
+            todayclose = f"mktclose: {convert_time(untilClose)}"
             daysInMonth = f"dim: {tradingDaysRemainingInMonth()}"
             daysInYear = f"diy: {tradingDaysRemainingInYear()}"
 
@@ -5203,9 +5592,12 @@ class IBKRCmdlineApp:
             # helps save your screen space a bit).
             # We could extend this "show/hide" system to different categories or symbols in the future.
             for qp, (sym, quote) in enumerate(qs):
-                if niceticker := formatTicker(quote):
+                if niceticker := renderTicker(sym, quote):
                     rows.append(f"{qp:>2}) " + niceticker)
 
+            # also drops rows for symbols no longer quoted
+            self.toolbarRows = rowsCurrent
+
             # basically, if we've never reconnected, then only show one update count
             if self.updates == self.updatesReconnect:
                 updatesFmt = f"[{self.updates:,}]"
@@ -5216,6 +5608,10 @@ class IBKRCmdlineApp:
                 #  so having a "double count" can help show users to wait a little longer for the client-side derived metrics to catch up again).
                 updatesFmt = f"[{self.updates:,}; {self.updatesReconnect:,}]"
 
+            # current refresh interval (adapted by the toolbar governor) and how long the previous render took
+            governor = self.toolbarGovernor
+            updatesFmt += f" ({governor.current:.2f}s; {governor.cost * 1000:.1f} ms)"
+
             return HTML(
                 # all these spaces look weird, but they (kinda) match the underlying column-based formatting offsets
                 f"""[{self.clientId}] {str(self.now):<44}{onc} {updatesFmt}          {spxbreakers}          {openorders}    {openpositions}    {todayexecutions}      {todayclose}   ({daysInMonth} :: {daysInYear})\n"""
@@ -5230,9 +5626,11 @@ class IBKRCmdlineApp:
     async def qask(self, terms) -> dict[str, Any] | None:
         """Ask a questionary survey using integrated existing toolbar showing"""
         result = dict()
+        # Note: no 'refresh_interval' here because these prompts are for placing or changing orders,
+        #       so we don't want toolbar refreshes competing with the order flow (the toolbar
+        #       is drawn when each question appears, then stays as-is until answered).
         extraArgs = dict(
             bottom_toolbar=self.bottomToolbar,
-            refresh_interval=self.toolbarUpdateInterval,
             style=self.toolbarStyle,
         )
         for t in terms:
@@ -5240,7 +5638,8 @@ class IBKRCmdlineApp:
                 continue
 
             try:
-                got = await t.ask(**extraArgs)
+                with self.toolbarGovernor.pausing():
+                    got = await t.ask(**extraArgs)
             except EOFError:
                 # if user hits CTRL-D in an input box, we get an exception which is just an input error
                 got = None
@@ -5299,7 +5698,7 @@ class IBKRCmdlineApp:
 
             # logger.info("[{}] Adding new live quote: {}", symkey, contract)
             ticker = self.ib.reqMktData(contract, tickFields)
-            self.quoteState[symkey] = ITicker(ticker, self)
+            self.quoteAdd(symkey, ITicker(ticker, self))
 
             # Note: IBKR uses the same 'contract id' for all bags, so this is invalid for bags...
             self.contractIdsToQuoteKeysMappings[contract.conId] = symkey
@@ -5317,19 +5716,38 @@ class IBKRCmdlineApp:
 
         return symkey
 
+    def quoteAdd(self, symkey, iticker: ITicker) -> None:
+        """Add live quote 'iticker' to our quote state under 'symkey' (at its sorted display position)."""
+        self.quoteState[symkey] = iticker
+        self.indicatorsDirty = True
+        self.quoteIndex.add(
+            symkey, iticker, sortQuotes((symkey, iticker), self.conIdCache)
+        )
+
+    def quoteRemove(self, symkey) -> ITicker:
+        """Remove live quote 'symkey' from our quote state (raises KeyError if 'symkey' isn't quoted)."""
+        iticker = self.quoteState.pop(symkey)
+        self.quoteIndex.remove(symkey)
+        self.indicatorsDirty = True
+        return iticker
+
+    def quoteClear(self) -> None:
+        """Remove all live quotes from our quote state."""
+        self.quoteState.clear()
+        self.quoteIndex.clear()
+        self.indicatorsDirty = True
+
     @property
-    def quoteStateSorted(self):
+    def quoteStateSorted(self) -> list[tuple[str, ITicker]]:
         """Return the EXACT toolbar ticker/quote content in position-accurate iteration order.
 
-        This can be used for iterating quotes/tickers by position if we need to elsewhere."""
-        tickersSortedByPosition = sorted(
-            self.quoteState.items(), key=lambda x: sortQuotes(x, self.conIdCache)
-        )
-
-        # replace the global mapping each time too
-        self.quotesPositional = tickersSortedByPosition
+        This can be used for iterating quotes/tickers by position if we need to elsewhere.
+        (this is the live index itself, so copy it if you need to add or remove quotes while iterating)"""
+        return self.quoteIndex.entries  # type: ignore
 
-        return tickersSortedByPosition
+    @property
+    def quotesPositional(self) -> list[tuple[str, ITicker]]:
+        return self.quoteIndex.entries  # type: ignore
 
     def quoteExists(self, contract):
         return lookupKey(contract) in self.quoteState
@@ -5549,7 +5967,8 @@ class IBKRCmdlineApp:
 
                 iticker.legs = tuple(legs)
                 iticker.width = width
-                iticker.updateGreeks()
+                iticker.legsDirty = True
+                iticker.refreshLegs()
 
     async def runCollective(self, concurrentCmds):
         """Given a list of commands and arguments, run them all concurrently."""
@@ -5592,11 +6011,11 @@ class IBKRCmdlineApp:
                 if "token" in se or "terminal" in se:
                     # don't show a 100 line stack trace for mistyped inputs.
                     # Just tell the user it needs to be corrected.
-                    err("[{}] Error parsing your input: {}", [cmd] + rest or [], se)
+                    err("[{}] Error parsing your input: {}", [cmd, *rest], se)
                 else:
-                    err("[{}] Error with command: {}", [cmd] + rest or [], se)
+                    err("[{}] Error with command: {}", [cmd, *rest], se)
 
-    def buildRunnablesFromCommandRequest(self, text1):
+    def commandPlanBuild(self, text1: str) -> CommandPlan:
         # Attempt to run the command(s) submitted into the prompt.
         #
         # Commands can be:
@@ -5641,11 +6060,14 @@ class IBKRCmdlineApp:
         # extra 30 us at the worst case, so it still allows over 30,000 command
         # parsing events per second (and we always end up blocked by the IBKR
         # gateway latency anyway which takes 100 ms to 300 ms for replies to the API)
+        #
+        # The parsed result is a CommandPlan, so commands run repeatedly (like predicate actions) can
+        # be parsed once then run from their plan every time after (see commandPlan()).
 
-        runnables: list[Awaitable[None]] = []
+        steps: list[tuple[bool, tuple[tuple[str, tuple[str, ...], str], ...]]] = []
 
         # 'collective' holds the current accumulating concurrency group
-        collective = []
+        collective: list[tuple[str, tuple[str, ...], str]] = []
 
         # Note: comments (if any) must have a leading space so we don't wipe out things like setting color hex codes with fg:#dfdfdf etc
 
@@ -5682,40 +6104,67 @@ class IBKRCmdlineApp:
             # If background command, add to our background concurrency group for this block
             if isBackgroundCmd:
                 # now fixup background command...
-                collective.append((cmd, rest, ccmd))
+                collective.append((cmd, tuple(rest), ccmd))
 
                 # this 'run group' count is BEFORE the runnable is added
                 logger.info(
                     "[{} :: concurrent] Added command to run group {}",
                     ccmd,
-                    len(runnables),
+                    len(steps),
                 )
                 continue
 
             # if we have previously saved concurrent tasks and this task is NOT concurrent, add all concurrent tasks,
             # THEN add this task.
             if collective and not isBackgroundCmd:
-                runnables.append(self.runCollective(collective.copy()))
+                steps.append((True, tuple(collective)))
 
                 # now since we added everything, remove the pending tasks so we don't schedule them again.
                 collective.clear()
 
             # now schedule SINGLE command since we know the collective is properly handled already
-            runnables.append(self.runSingleCommand(cmd, rest))
+            steps.append((False, ((cmd, tuple(rest), ccmd),)))
 
-            if len(runnables) and len(ccmds) > 1:
+            if len(steps) and len(ccmds) > 1:
                 # this 'run group' count is AFTER the runnable is added (so we subtract one to get the actual order number)
                 logger.info(
                     "[{} :: sequential] Added command to run group {}",
                     ccmd,
-                    len(runnables) - 1,
+                    len(steps) - 1,
                 )
 
         # extra catch: if our commands END with a collective command, we need to now add them here too
         # (because the prior condition only checks if we went collective->single; but if we are ALL collective,
         #  we never trigger the "is single, cut previously collective into a full group" condition)
         if collective:
-            runnables.append(self.runCollective(collective.copy()))
+            steps.append((True, tuple(collective)))
+
+        return CommandPlan(text1, tuple(steps))
+
+    def commandPlan(self, text1: str) -> CommandPlan:
+        """Return the CommandPlan for 'text1', only parsing 'text1' the first time we see it.
+
+        Used for commands which run repeatedly (like predicate actions firing on every trigger)."""
+        if plan := self.commandPlans.get(text1):
+            self.commandPlansInfo["hits"] += 1
+            return plan
+
+        self.commandPlansInfo["misses"] += 1
+        plan = self.commandPlans[text1] = self.commandPlanBuild(text1)
+        return plan
+
+    def buildRunnablesFromCommandRequest(
+        self, text1: str | CommandPlan
+    ) -> list[Awaitable[None]]:
+        plan = text1 if isinstance(text1, CommandPlan) else self.commandPlanBuild(text1)
+
+        runnables: list[Awaitable[None]] = []
+        for concurrent, planned in plan.steps:
+            if concurrent:
+                runnables.append(self.runCollective(planned))
+            else:
+                for cmd, rest, _ in planned:
+                    runnables.append(self.runSingleCommand(cmd, rest))
 
         return runnables
 
@@ -5761,6 +6210,7 @@ class IBKRCmdlineApp:
         self.ib.pnlEvent += self.updatePNL
         self.ib.orderStatusEvent += self.updateOrder
         self.ib.errorEvent += self.errorHandler
+        self.ib.errorEvent += self.deadContracts.requestError
         self.ib.cancelOrderEvent += self.cancelHandler
         self.ib.commissionReportEvent += self.commissionHandler
         self.ib.newsBulletinEvent += self.newsBHandler
@@ -5777,11 +6227,21 @@ class IBKRCmdlineApp:
         # for later backtest handling.
         self.ib.pendingTickersEvent += self.tickersUpdate
 
+        # if 'tickerInterval' is enabled, ticker updates are only processed by this periodic pass
+        self.task_create("ticker processor", self.tickersProcessor())
+
+        # deliver alerts generated during ticker updates
+        self.task_create("alert delivery", self.alerts.run())
+
+        if self.predicateWorker:
+            self.task_create("predicate results", self.predicateResultsProcessor())
+
         # openOrderEvent is noisy and randomly just re-submits
         # already static order details as new events.
         # self.ib.openOrderEvent += self.orderOpenHandler
         self.ib.execDetailsEvent += self.orderExecuteHandler
         self.ib.positionEvent += self.positionEventHandler
+        self.ib.updatePortfolioEvent += self.positionOverlay.portfolio
 
         async def requestMarketData():
             logger.info("Requesting market data...")
@@ -5795,7 +6255,7 @@ class IBKRCmdlineApp:
             # resubscribe to active quotes
             # remove all quotes and re-subscribe to the current quote state
             logger.info("[quotes] Restoring quote state...")
-            self.quoteState.clear()
+            self.quoteClear()
 
             # Note: always restore snapshot state FIRST so the commands further down don't overwrite
             #       our state with only startup entries.
@@ -5846,13 +6306,16 @@ class IBKRCmdlineApp:
 
             # also, re-attach predicate data readers since any previous live data sources
             # the predicates were attached to no longer exist after the reconnect().
+            predicates = await self.predicatesRun(
+                lambda: list(self.ifthenRuntime.predicates.values())
+            )
+
             await asyncio.gather(
-                *[
-                    self.predicateSetup(prepredicate)
-                    for prepredicate in self.ifthenRuntime.predicates.values()
-                ]
+                *[self.predicateSetup(prepredicate) for prepredicate in predicates]
             )
 
+            await self.ifthenSymbolsRefresh()
+
         async def reconnect():
             # don't reconnect if an exit is requested
             if self.exiting:
@@ -5922,10 +6385,14 @@ class IBKRCmdlineApp:
                     # request live updates (well, once per second) of account and position values
                     self.ib.reqPnL(self.accountId)
 
+                    # start our position overlay from the portfolio loaded during connect
+                    # (then portfolio and position events keep it current)
+                    self.positionOverlay.reset(self.ib.portfolio())
+
                     # Subscribe to realtime PnL updates for all positions in account
                     # Note: these are updated once per second per position! nice.
                     # TODO: add this to the account order/filling notifications too.
-                    for p in self.ib.portfolio():
+                    for p in self.positionOverlay.rows.values():
                         self.pnlSingle[p.contract.conId] = self.ib.reqPnLSingle(
                             self.accountId, "", p.contract.conId
                         )
@@ -5978,7 +6445,7 @@ class IBKRCmdlineApp:
         set_title(f"{self.levelName().title()} Trader ({self.clientId}){customName}")
         self.ib.disconnectedEvent += lambda: self.task_create("reconnect", reconnect())
 
-    async def buildAndRun(self, text1):
+    async def buildAndRun(self, text1: str | CommandPlan):
         # 'runnables' is the list of all commands to run after we collect them
         runnables = self.buildRunnablesFromCommandRequest(text1)
 
@@ -6013,19 +6480,29 @@ class IBKRCmdlineApp:
         app = session.app
         loop = asyncio.get_event_loop()
 
-        async def updateToolbar():
+        governor = self.toolbarGovernor
+
+        async def updateToolbar(expected: float):
             """Update account balances"""
-            try:
-                app.invalidate()
-            except:
-                # network error, don't update anything
-                pass
+            # how late we are running is how far behind the event loop is
+            governor.lagged(max(0.0, loop.time() - expected))
+
+            if not governor.paused:
+                try:
+                    app.invalidate()
+                except:
+                    # network error, don't update anything
+                    pass
 
+            # Note: the render cost measured here is from the previous invalidate() because rendering
+            #       runs later in its own prompt_toolkit task.
+            interval = governor.next()
+            expected = loop.time() + interval
             loop.call_later(
-                self.toolbarUpdateInterval, lambda: asyncio.create_task(updateToolbar())
+                interval, lambda: asyncio.create_task(updateToolbar(expected))
             )
 
-        loop.create_task(updateToolbar())
+        loop.create_task(updateToolbar(loop.time()))
 
         # The Command Processing REPL
         while True:
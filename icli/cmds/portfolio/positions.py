@@ -189,7 +189,7 @@ class IOpPositions(IOp):
         return df
 
     async def run(self):
-        ords = self.ib.portfolio()
+        ords = list(self.state.positionOverlay.rows.values())
         # logger.info("port: {}", pp.pformat(ords))
 
         backQuickRef = []
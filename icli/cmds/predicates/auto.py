@@ -123,8 +123,12 @@ class IOpPredicateAutoRunner(IOp):
                 #       since 'enable=True' here should cause the runtime to genreate an activation itself?
                 #       We lost track of how the activations work somewhere along the way and which ones
                 #       are enabling which features.
-                created_count, start_ids, all_ids = it.activate(
-                    self.templateName, self.name, self.properties, enable=True
+                created_count, start_ids, all_ids = await self.state.predicatesRun(
+                    it.activate,
+                    self.templateName,
+                    self.name,
+                    self.properties,
+                    enable=True,
                 )
 
                 # this is just a silly way of telling mypy we do not have any `None` entries in
@@ -137,9 +141,17 @@ class IOpPredicateAutoRunner(IOp):
                 # start the top-level predicate entry points
                 for start_id in start_ids:
                     logger.info("Starting ifthen predicate id: {}", start_id)
-                    self.state.ifthenRuntime.activate(start_id)
+                    await self.state.predicatesRun(
+                        self.state.ifthenRuntime.activate, start_id
+                    )
+
+                await self.state.ifthenSymbolsRefresh()
             case "stop":
-                it.deactivate(self.templateName, self.name)
+                await self.state.predicatesRun(
+                    it.deactivate, self.templateName, self.name
+                )
+
+                await self.state.ifthenSymbolsRefresh()
             case "report-all":
                 logger.info(
                     "{}",
@@ -35,9 +35,11 @@ class IOpPredicateClearAll(IOp):
     async def run(self):
         if self.everything:
             logger.info("Deleting ALL Predicates")
-            self.state.ifthenRuntime.clear()
+            await self.state.predicatesRun(self.state.ifthenRuntime.clear)
         else:
             logger.info(
                 "Stopping all predicates, but they still exist to be re-activated"
             )
-            self.state.ifthenRuntime.clearActive()
+            await self.state.predicatesRun(self.state.ifthenRuntime.clearActive)
+
+        await self.state.ifthenSymbolsRefresh()
@@ -71,13 +71,16 @@ class IOpPredicateGroup(IOp):
 
                 content = doit.read_text()
                 logger.info("[{}] Generate predicates from:\n{}", doit, content)
-                created, starts, populate = loader.load(content, activate=False)
+                created, starts, populate = await self.state.predicatesRun(
+                    loader.load, content, activate=False
+                )
 
                 # after loaded/created/activated, we now must POPULATE each predicate with our custom data function attachments
                 for pid in populate:
                     await self.state.predicateSetup(self.state.ifthenRuntime[pid])
 
-                loader.activate(starts)
+                await self.state.predicatesRun(loader.activate, starts)
+                await self.state.ifthenSymbolsRefresh()
 
                 logger.info("[{}] Created {} predicates!", doit, created)
             case _:
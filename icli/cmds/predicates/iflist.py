@@ -28,7 +28,7 @@ class IOpPredicateList(IOp):
         return [DArg("*pids", convert=lambda x: [int(y) for y in x])]
 
     async def run(self):
-        preds, actives = self.state.ifthenRuntime.report()
+        preds, actives = await self.state.predicatesRun(self.state.ifthenRuntime.report)
 
         if self.pids:
             for p in self.pids:
@@ -37,7 +37,12 @@ class IOpPredicateDelete(IOp):
         logger.info("Deleting Predicates: {}", sorted(self.ids))
         for pid in self.ids:
             try:
-                predicate = self.state.ifthenRuntime.remove(pid)
+                predicate = await self.state.predicatesRun(
+                    self.state.ifthenRuntime.remove, pid
+                )
+
                 logger.info("[{}] predicate deleted: {}", pid, pp.pformat(predicate))
             except:
                 logger.warning("[{}] predicate not found; nothing deleted", pid)
+
+        await self.state.ifthenSymbolsRefresh()
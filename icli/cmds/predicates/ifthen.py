@@ -40,9 +40,10 @@ class IOpPredicateCreate(IOp):
         #   - subscribe predicate to symbols used for decision making
         #   - view current state of each element of the predicate
 
-        pid = self.state.ifthenRuntime.parse(self.predicate)
+        runtime = self.state.ifthenRuntime
+        pid = await self.state.predicatesRun(runtime.parse, self.predicate)
+        prepredicate = runtime[pid]
 
-        prepredicate = self.state.ifthenRuntime[pid]
         logger.info("[{}] Parsed: {}", pid, pp.pformat(prepredicate))
 
         assert prepredicate is not None
@@ -51,4 +52,7 @@ class IOpPredicateCreate(IOp):
 
         # now, since we attached the proper data extractors, we can enable the predicate for running
         # Here, for SINGLE predicates, we mark them to delete after one success.
-        self.state.ifthenRuntime.activate(pid, once=True)
+        await self.state.predicatesRun(runtime.activate, pid, once=True)
+
+        # new predicates only get snapshot data (and the immediate ticker lane) after refreshing
+        await self.state.ifthenSymbolsRefresh()
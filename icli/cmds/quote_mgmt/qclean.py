@@ -14,7 +14,6 @@ from icli.helpers import *
 
 if TYPE_CHECKING:
     pass
-import whenever
 
 
 @command(names=["qclean"])
@@ -34,17 +33,13 @@ class IOpQuoteClean(IOp):
 
         # Find any expired option symbols and remove them
         remove = []
-        now = whenever.ZonedDateTime.now("US/Eastern")
 
-        # if after market close, use today; else use previous day since market is still open
-        if (now.hour, now.minute) < (16, 15):
-            now = now.subtract(whenever.days(1), disambiguate="compatible")
-
-        datecompare = f"{now.year - 2000}{now.month:02}{now.day:02}"
+        # anything expiring before the current (or, if closed, the next) market session is expired
+        datecompare = self.state.sessionClock.update().sessionDate[2:]
         for x in symbols:
             if len(x) > 10:
                 date = x[-15 : -15 + 6]
-                if date <= datecompare:
+                if date < datecompare:
                     logger.info("Removing expired quote: {}", x)
                     remove.append(f'"{x}"')
 
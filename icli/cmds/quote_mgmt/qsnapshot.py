@@ -25,7 +25,7 @@ class IOpQuoteSaveClientSnapshot(IOp):
 
     async def run(self):
         cacheKey = ("quotes", f"client-{self.state.clientId}")
-        allLiveContracts = [c.contract for c in self.state.quoteState.values()]
+        allLiveContracts = [c.contract for _, c in self.state.quoteStateSorted]
         self.cache.set(cacheKey, {"contracts": allLiveContracts})  # type: ignore
 
         # This log line is nice for debugging but too noisy to run on every snapshot
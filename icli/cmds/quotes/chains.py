@@ -242,6 +242,9 @@ class IOpOptionChain(IOp):
 
                 got[symbol] = strikes
 
+                # new chain data may list contracts we recently failed to find, so let them be looked up again
+                self.state.deadContracts.invalidate(contractExact.symbol)
+
                 # Format and display the strikes in horizontal format
                 await self.displayChains(symbol, strikes)
             except:
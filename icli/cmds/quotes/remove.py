@@ -54,7 +54,7 @@ class IOpQuotesRemove(IOp):
 
                 symkey = lookupKey(contract)
                 try:
-                    del self.state.quoteState[symkey]
+                    self.state.quoteRemove(symkey)
 
                     logger.info(
                         "[{} :: {}] Removed: {} ({})",
@@ -53,7 +53,8 @@ class IOpAdviceMode(IOp):
         spxContracts = filter(lambda x: isinstance(x, Option), addedContracts)
 
         # now look up tickers for each of the options...
-        tickers = [self.state.quoteState[lookupKey(x)] for x in spxContracts]
+        spx = {lookupKey(x): self.state.quoteState[lookupKey(x)] for x in spxContracts}
+        tickers = list(spx.values())
 
         callVWAPDistance = 0
         putVWAPDistance = 0
@@ -91,6 +92,20 @@ class IOpAdviceMode(IOp):
         # fetch tickers from lookup keys
         rtyt, est, nqt = (self.state.quoteState[x] for x in [rtyk, esk, nqk])
 
+        # keep EMAs and quoteflow updating for everything we score
+        # (anything enabled just now has no data until future runs)
+        fresh = self.state.indicatorDemand.request(
+            "advice",
+            spx | {"VIX": v, rtyk: rtyt, esk: est, nqk: nqt},
+            COMMAND_INDICATORS["advice"],
+        )
+
+        if fresh:
+            logger.warning(
+                "Started collecting indicators for {} (run advice again later for complete results)",
+                sorted(fresh),
+            )
+
         def emaCheck(ticker, fast, slow) -> float:
             """Run fast/slow crossover distance for ticker and return the percentage difference."""
             return round(
@@ -78,9 +78,9 @@ class IOpAlert(IOp):
                 if len(self.data) > 1:
                     for level in self.data[1:]:
                         if found := iticker.levels.get(int(level)):
-                            found.enabled = enable
+                            iticker.levelsEnable(found, enable)
                             logger.info("Now enabled={} for {}", enable, found)
                 else:
                     for l in iticker.levels.values():
-                        l.enabled = enable
+                        iticker.levelsEnable(l, enable)
                         logger.info("Now enabled={} for {}", enable, l)
@@ -0,0 +1,62 @@
+"""Command: alertstats
+
+Category: Utilities
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from mutil.dispatch import DArg
+
+from icli.cmds.base import IOp, command
+from icli.helpers import *
+
+if TYPE_CHECKING:
+    pass
+
+
+@command(names=["alertstats"])
+@dataclass
+class IOpAlertStats(IOp):
+    """Show per-alert counts of queued, suppressed, dropped, expired, delivered, and failed spoken alerts.
+
+    Optionally provide a substring to only show alerts containing the substring."""
+
+    match: str = field(init=False)
+
+    def argmap(self):
+        return [DArg("match", default="", convert=str.upper)]
+
+    async def run(self):
+        report = self.state.alerts.report()
+
+        if self.match:
+            report = {k: v for k, v in report.items() if self.match in k.upper()}
+
+        if not report:
+            logger.info("No alerts generated yet!")
+            return
+
+        df = pd.DataFrame.from_records(
+            [
+                dict(
+                    queued=c.queued,
+                    suppressed=c.suppressed,
+                    dropped=c.dropped,
+                    expired=c.expired,
+                    delivered=c.delivered,
+                    failed=c.failed,
+                )
+                for c in report.values()
+            ],
+            index=list(report.keys()),
+        )
+
+        df.loc["TOTAL"] = df.sum()
+
+        logger.info(
+            "Alerts (pending {}):\n{}",
+            self.state.alerts.queue.qsize(),
+            df.to_string(),
+        )
@@ -0,0 +1,59 @@
+"""Command: caches
+
+Category: Utilities
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from icli.cmds.base import IOp, command
+from icli.helpers import *
+
+if TYPE_CHECKING:
+    pass
+
+
+@command(names=["caches"])
+@dataclass
+class IOpCaches(IOp):
+    """Show size and hit rate of every memoization cache."""
+
+    def argmap(self):
+        return []
+
+    async def run(self):
+        rows = {}
+        for name, fn in sorted(MEMOIZED.items()):
+            hits, misses, maxsize, currsize = fn.cache_info()
+            rows[name] = (hits, misses, currsize, maxsize)
+
+        # memory tier of our contract cache (misses are reads from disk)
+        hits, misses, maxsize, currsize = self.state.conIdCache.cache_info()
+        rows["conIdCache"] = (hits, misses, currsize, maxsize)
+
+        # contracts IBKR failed to resolve (hits are lookups we skipped)
+        hits, misses, maxsize, currsize = self.state.deadContracts.cache_info()
+        rows["deadContracts"] = (hits, misses, currsize, maxsize)
+
+        plans = self.state.commandPlans
+        rows["commandPlan"] = (
+            self.state.commandPlansInfo["hits"],
+            self.state.commandPlansInfo["misses"],
+            plans.currsize,
+            plans.maxsize,
+        )
+
+        df = pd.DataFrame.from_dict(
+            rows, orient="index", columns=["hits", "misses", "size", "maxsize"]
+        )
+
+        lookups = df.hits + df.misses
+        df["hit%"] = (df.hits / lookups.where(lookups > 0) * 100).round(2)
+
+        logger.info(
+            "Caches (quotes: {:,}):\n{}",
+            len(self.state.quoteIndex),
+            df.to_string(),
+        )
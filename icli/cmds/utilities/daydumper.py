@@ -285,4 +285,7 @@ class IOpDayDumper(IOp):
         )
 
         # a little abstraction breakage here. Is fine.
-        self.state.quoteState[symkey].levels[barDiffSec] = lb
+        self.state.quoteState[symkey].levelsSet(lb)
+
+        # quotes with levels run level breach alerts (which need EMAs)
+        self.state.indicatorsDirty = True
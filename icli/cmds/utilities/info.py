@@ -72,6 +72,16 @@ class IOpInfo(IOp):
             if iticker := self.state.quoteState.get(symkey, None):
                 ticker = iticker.ticker
 
+                # keep the stats we report updating (anything enabled just now has no data until future runs)
+                if fresh := self.state.indicatorDemand.request(
+                    "info", {symkey: iticker}, COMMAND_INDICATORS["info"]
+                ):
+                    logger.warning(
+                        "[{}] Started collecting {} (run info again later for their stats)",
+                        symkey,
+                        sorted(fresh[symkey]),
+                    )
+
                 # The 'pprint' module doesn't use our nice __repr__ override which removes all nan/None fileds (sometimes dozens per ticker),
                 # so let's hack around it by printing the formatted dataclass, splitting by comma lines,
                 # removing rows with nan values, then just re-assembling it.
@@ -295,14 +305,14 @@ class IOpInfo(IOp):
 
                 try:
                     # 'statistics' throws an error if there's not enough history yet
-                    qs = statistics.quantiles(iticker.history, n=7, method="inclusive")
+                    qs = iticker.history.quantiles(n=7)
 
                     bpos = bisect.bisect_left(qs, iticker.ema[0])
                     qss = [f"{x:,.{digits}f}" for x in qs]
                     qss.insert(bpos, "[X]")
 
-                    low = min(iticker.history)
-                    high = max(iticker.history)
+                    low = iticker.history.min
+                    high = iticker.history.max
 
                     logger.info(
                         "[{}] stats (from {}): [range {:,.{}f}] [min {:,.{}f}] [max {:,.{}f}] [std {:,.{}f}]",
@@ -314,7 +324,7 @@ class IOpInfo(IOp):
                         digits,
                         high,
                         digits,
-                        statistics.stdev(iticker.history),
+                        iticker.history.stdev(),
                         digits,
                     )
 
@@ -0,0 +1,88 @@
+"""Command: latency
+
+Category: Utilities
+"""
+
+import datetime
+import pathlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from mutil.dispatch import DArg
+
+from icli.cmds.base import IOp, command
+from icli.helpers import *
+
+if TYPE_CHECKING:
+    pass
+
+
+@command(names=["latency"])
+@dataclass
+class IOpLatency(IOp):
+    """Show tick-to-action latency histograms (in microseconds) for each processing stage.
+
+    Stages:
+      - tick:staged — tick arrival until all EMAs for the update are calculated
+      - tick:processed — tick arrival until alerts and predicate checks complete
+      - tick:fired — tick arrival until a predicate schedules its command
+      - fired:order — predicate command scheduled until ib.placeOrder() runs
+      - tick:order — tick arrival until ib.placeOrder() runs
+
+    Use 'latency reset' to clear all histograms or 'latency dump [filename]' to save them as JSON."""
+
+    action: str = field(init=False)
+    filename: str = field(init=False)
+
+    def argmap(self):
+        return [
+            DArg("action", default="show", convert=str.lower),
+            DArg("filename", default=""),
+        ]
+
+    async def run(self):
+        tracker = self.state.latency
+
+        match self.action:
+            case "reset":
+                tracker.reset()
+                logger.info("Latency histograms reset!")
+            case "dump":
+                filename = pathlib.Path(
+                    self.filename
+                    or f"latency-{datetime.datetime.now().date()}-{self.state.clientId}.json"
+                )
+
+                # save summaries and raw bucket counts so histograms can be compared or merged later
+                filename.write_bytes(
+                    ourjson.dumps(
+                        dict(
+                            since=tracker.created,
+                            dumped=time.time(),
+                            stages={
+                                stage: dict(
+                                    summary=hist.summary(),
+                                    subBits=hist.subBits,
+                                    counts=hist.counts,
+                                )
+                                for stage, hist in tracker.stages.items()
+                            },
+                        )
+                    )
+                )
+
+                logger.info("Saved latency histograms to: {}", filename)
+            case _:
+                if not tracker.stages:
+                    logger.info("No latency recorded yet!")
+                    return
+
+                df = pd.DataFrame.from_dict(tracker.summary(), orient="index")
+                df["count"] = df["count"].astype(int)
+
+                logger.info(
+                    "Latency (microseconds) since {}:\n{}",
+                    pd.Timestamp(tracker.created, unit="s", tz="US/Eastern"),
+                    df.to_string(float_format=lambda x: f"{x:,.1f}"),
+                )
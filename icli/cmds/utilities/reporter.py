@@ -7,7 +7,6 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from loguru import logger
-from mutil.bgtask import BGSchedule
 from mutil.dispatch import DArg
 
 from icli.cmds.base import IOp, command
@@ -15,7 +14,7 @@ from icli.helpers import *
 
 if TYPE_CHECKING:
     pass
-import sys
+import asyncio
 
 
 @command(names=["reporter"])
@@ -59,7 +58,7 @@ class IOpMarketReporter(IOp):
             sym = iticker.contract.localSymbol
 
             def positionSuggestion(scores):
-                vixReport = vix.rms()
+                vixReport = vix.ema.rms()
 
                 suggest = "NONE YET"
 
@@ -72,6 +71,22 @@ class IOpMarketReporter(IOp):
 
                 pass
 
+        async def reporting(symkey, iticker):
+            """Report on symbol every 90 seconds until stopped."""
+            # keep the EMAs we report on updating even if nothing else is using them
+            # (until this reporter stops, so each reporter has its own demand)
+            consumer = f"reporter {symkey}"
+            demand = self.state.indicatorDemand
+            demand.request(consumer, {symkey: iticker}, COMMAND_INDICATORS["reporter"])
+            demand.request(consumer, {vkey: vix}, frozenset({"ema"}))
+
+            try:
+                while True:
+                    await report(iticker)
+                    await asyncio.sleep(90)
+            finally:
+                demand.withdraw(consumer)
+
         for symbol in self.symbols:
             # Step 1: Run First Report
             # Step 2: Create reporter for symbol
@@ -87,13 +102,11 @@ class IOpMarketReporter(IOp):
 
             symkey = lookupKey(contract)
             iticker = self.state.quoteState.get(symkey)
+            assert iticker
 
             created = self.task_create(
                 f"market direction reporter for {symbol}",
-                report(iticker),
-                schedule=BGSchedule(
-                    delay=0, runtimes=int(sys.float_info.max), pause=90
-                ),
+                reporting(symkey, iticker),
             )
 
             logger.info("[{}] Created recurring reporting task: {}", symbol, created)
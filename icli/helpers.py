@@ -85,17 +85,24 @@ def format_option_symbol(
 
 import asyncio
 import bisect
+import contextlib
+import contextvars
+import copy
+import dataclasses
 import enum
 import functools
 import locale
 import math
+import multiprocessing
 import platform
 import re
 import statistics
 import time
 import types
+import weakref
 
 import dateutil
+import diskcache  # type: ignore
 import numpy as np
 import pandas as pd
 
@@ -114,6 +121,8 @@ else:
 import datetime
 import os
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from decimal import Decimal
 from functools import cached_property
@@ -124,16 +133,18 @@ import ib_async  # just for UNSET_DOUBLE
 import questionary
 import tradeapis.cal as tcal
 import websockets
-from cachetools import cached
+from cachetools import LRUCache, TTLCache, cached
 from dotenv import dotenv_values
 from ib_async import (
     CFD,
     Bag,
     Bond,
+    ComboLeg,
     Commodity,
     ContFuture,
     Contract,
     Crypto,
+    DeltaNeutralContract,
     Forex,
     Future,
     FuturesOption,
@@ -142,6 +153,8 @@ from ib_async import (
     Option,
     OptionComputation,
     Order,
+    PortfolioItem,
+    Position,
     Stock,
     Ticker,
     Trade,
@@ -293,6 +306,263 @@ type Seconds = int
 
 RTH_EMA_VWAP: Final = 23_400
 
+# every memoized function by name for reporting cache hit rates.
+# Memoized functions always use bounded caches (so long running sessions don't grow forever as symbols come and go)
+# and always provide cache_info() as (hits, misses, maxsize, currsize) like functools.lru_cache.
+MEMOIZED: Final[dict[str, Callable[..., Any]]] = {}
+
+
+def memoized(fn):
+    """Register memoized function 'fn' for hit rate reporting.
+
+    'fn' must be wrapped in @cached(..., info=True) or @functools.lru_cache() already."""
+    MEMOIZED[fn.__name__] = fn
+    return fn
+
+
+class TieredCache:
+    """Bounded in-memory LRU in front of a diskcache.Cache.
+
+    Reads only fall through to disk (a SQLite query plus an unpickle) when a key isn't in memory.
+    Writes go to both tiers, and memory entries expire at the same time as their disk entries.
+
+    Note: values in memory are shared between all readers, so copy them before modifying them.
+    (set() stores a copy, so callers may keep modifying the objects they save)
+    """
+
+    __slots__ = ("disk", "memory", "hits", "misses")
+
+    # marker for keys missing from disk (because None can be a value)
+    MISSING: Final = object()
+
+    def __init__(self, disk: diskcache.Cache, maxsize: int = 16_384) -> None:
+        self.disk = disk
+
+        # key -> (value, epoch expiration or None for never)
+        self.memory: LRUCache[Any, tuple[Any, float | None]] = LRUCache(maxsize)
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if found := self.memory.get(key):
+            value, expires = found
+            if expires is None or expires > time.time():
+                self.hits += 1
+                return value
+
+            del self.memory[key]
+
+        self.misses += 1
+        value, expires = self.fetch(key)
+        if value is self.MISSING:
+            return default
+
+        self.memory[key] = (value, expires)
+        return value
+
+    def fetch(self, key) -> tuple[Any, float | None]:
+        """Read (value or MISSING, epoch expiration) from disk."""
+        return self.disk.get(key, self.MISSING, expire_time=True)
+
+    def set(self, key, value, expire: float | None = None) -> bool:
+        self.remember(key, value, expire)
+        return self.disk.set(key, value, expire=expire)
+
+    def remember(self, key, value, expire: float | None) -> None:
+        # (copy because callers keep using what they saved, like qualify() returning contracts it
+        #  cached which callers then modify for orders (setting exchanges, etc))
+        self.memory[key] = (copy.copy(value), time.time() + expire if expire else None)
+
+    def __getitem__(self, key):
+        if (value := self.get(key, self.MISSING)) is self.MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self.MISSING) is not self.MISSING
+
+    def __delitem__(self, key) -> None:
+        self.memory.pop(key, None)
+        del self.disk[key]
+
+    def cache_info(self) -> tuple[int, int, int, int]:
+        """Return memory tier (hits, misses, maxsize, currsize) like functools.lru_cache."""
+        return (self.hits, self.misses, self.memory.maxsize, self.memory.currsize)
+
+
+# Contract cache record format version (the first byte of every record)
+CONTRACT_RECORD_VERSION: Final = 1
+
+# Contract fields stored (in this order) in version 1 records. Any other non-default fields (rare
+# things like comboLegs) are appended as one trailing JSON object.
+CONTRACT_RECORD_FIELDS: Final = (
+    "secType",
+    "conId",
+    "symbol",
+    "lastTradeDateOrContractMonth",
+    "strike",
+    "right",
+    "multiplier",
+    "exchange",
+    "primaryExchange",
+    "currency",
+    "localSymbol",
+    "tradingClass",
+)
+
+# ASCII unit separator between record fields (never present in IBKR symbols or names)
+CONTRACT_RECORD_SEP: Final = "\x1f"
+
+# contract class for each secType (same as Contract.create())
+CONTRACT_CLASSES: Final[dict[str, type[Contract]]] = {
+    "STK": Stock,
+    "OPT": Option,
+    "FUT": Future,
+    "CONTFUT": ContFuture,
+    "CASH": Forex,
+    "IND": Index,
+    "CFD": CFD,
+    "BOND": Bond,
+    "CMDTY": Commodity,
+    "FOP": FuturesOption,
+    "FUND": MutualFund,
+    "WAR": Warrant,
+    "IOPT": Warrant,
+    "BAG": Bag,
+    "CRYPTO": Crypto,
+}
+
+# defaults of the Contract fields in the ib_async version we are running
+CONTRACT_DEFAULTS: Final = {
+    f.name: f.default
+    for f in dataclasses.fields(Contract)
+    if f.default is not dataclasses.MISSING
+}
+
+CONTRACT_FACTORIES: Final = {
+    f.name: f.default_factory
+    for f in dataclasses.fields(Contract)
+    if f.default_factory is not dataclasses.MISSING
+}
+
+
+def contractEncode(contract: Contract) -> bytes:
+    """Encode a qualified contract as a compact versioned record for the contract cache.
+
+    Records store field values in our own fixed layout instead of pickling ib_async class state,
+    so ib_async upgrades changing Contract internals don't invalidate the cache."""
+    values = [
+        contract.secType,
+        str(contract.conId),
+        contract.symbol,
+        contract.lastTradeDateOrContractMonth,
+        repr(float(contract.strike or 0)),
+        contract.right,
+        contract.multiplier,
+        contract.exchange,
+        contract.primaryExchange,
+        contract.currency,
+        contract.localSymbol,
+        contract.tradingClass,
+    ]
+
+    extra = {}
+    for name, default in CONTRACT_DEFAULTS.items():
+        if name not in CONTRACT_RECORD_FIELDS and getattr(contract, name) != default:
+            extra[name] = getattr(contract, name)
+
+    if contract.comboLegs:
+        extra["comboLegs"] = [dataclasses.asdict(leg) for leg in contract.comboLegs]
+
+    if contract.deltaNeutralContract:
+        extra["deltaNeutralContract"] = dataclasses.asdict(
+            contract.deltaNeutralContract
+        )
+
+    if extra:
+        found = ourjson.dumps(extra)
+        values.append(found.decode() if isinstance(found, bytes) else found)
+
+    return (
+        bytes((CONTRACT_RECORD_VERSION,))
+        + CONTRACT_RECORD_SEP.join([v or "" for v in values]).encode()
+    )
+
+
+def contractDecode(record: bytes) -> Contract | None:
+    """Decode a contractEncode() record (or return None if the record is an unknown version)."""
+    if record[0] != CONTRACT_RECORD_VERSION:
+        return None
+
+    values = record[1:].decode().split(CONTRACT_RECORD_SEP)
+
+    # build the contract like unpickling does (without running __init__), but starting from the
+    # current ib_async defaults so any fields newer ib_async versions added still exist
+    cls = CONTRACT_CLASSES.get(values[0], Contract)
+    contract = cls.__new__(cls)
+    state = contract.__dict__
+    state.update(CONTRACT_DEFAULTS)
+    for name, factory in CONTRACT_FACTORIES.items():
+        state[name] = factory()
+
+    state.update(zip(CONTRACT_RECORD_FIELDS, values))
+    state["conId"] = int(values[1])
+    state["strike"] = float(values[4])
+
+    if len(values) > len(CONTRACT_RECORD_FIELDS):
+        extra = ourjson.loads(values[-1])
+        if legs := extra.pop("comboLegs", None):
+            state["comboLegs"] = [ComboLeg(**leg) for leg in legs]
+
+        if dnc := extra.pop("deltaNeutralContract", None):
+            state["deltaNeutralContract"] = DeltaNeutralContract(**dnc)
+
+        # (ignore fields our ib_async version doesn't have)
+        state.update((k, v) for k, v in extra.items() if k in CONTRACT_DEFAULTS)
+
+    return contract
+
+
+class ContractCache(TieredCache):
+    """TieredCache of qualified contracts stored on disk as contractEncode() records.
+
+    Each contract is stored once under its conId. Every other key (descriptors, symbols) only stores
+    the conId of its contract record. Pickled contracts from older caches are rewritten as records
+    when read.
+    """
+
+    __slots__ = ()
+
+    def fetch(self, key) -> tuple[Any, float | None]:
+        value, expires = self.disk.get(key, self.MISSING, expire_time=True)
+
+        if isinstance(value, bytes):
+            return contractDecode(value) or self.MISSING, expires
+
+        # secondary key pointing to a contract record
+        if isinstance(value, int):
+            return self.get(value, self.MISSING), expires
+
+        # migrate pickled contracts (and their conId record) keeping their original expiration
+        # (an existing conId record is kept because it was saved by its own qualify and may live longer)
+        if isinstance(value, Contract):
+            remaining = expires - time.time() if expires else None
+            if key != value.conId and value.conId not in self.disk:
+                self.set(value.conId, value, remaining)
+
+            self.set(key, value, remaining)
+
+        return value, expires
+
+    def set(self, key, value, expire: float | None = None) -> bool:
+        self.remember(key, value, expire)
+        if key == value.conId:
+            return self.disk.set(key, contractEncode(value), expire=expire)
+
+        return self.disk.set(key, value.conId, expire=expire)
+
 
 @dataclass(slots=True, frozen=True)
 class TradeOrder:
@@ -395,213 +665,433 @@ class PaperLog:
         self._trades.clear()
 
 
+# EMA durations in seconds
+# 3,900 seconds is 65 minutes; 23_400 seconds is 6.5 hours (390 minutes)
+# Added longer periods for trend analysis:
+# 4,500 = 75min (≈ EMA5 on 15min bars)
+# 7,200 = 2h (≈ EMA8 on 15min bars)
+# 18,900 = 5.25h (≈ EMA21 on 15min bars)
+# 75,600 = 21h (≈ EMA21 on 1h bars)
+# 180,000 = 50h (≈ EMA50 on 1h bars)
+TWEMA_DURATIONS: Final = (
+    0,  # we use '0' to mean "last value seen"
+    15,
+    30,
+    60,
+    120,
+    180,
+    300,
+    900,
+    1800,
+    3_900,
+    4_500,  # 75 minutes (≈ EMA5 on 15min bars)
+    7_200,  # 2 hours (≈ EMA8 on 15min bars)
+    18_900,  # 5.25 hours (≈ EMA21 on 15min bars)
+    75_600,  # 21 hours (≈ EMA21 on 1h bars)
+    180_000,  # 50 hours (≈ EMA50 on 1h bars)
+    RTH_EMA_VWAP,
+)
+
+
 @dataclass(slots=True)
-class TWEMA:
-    """Time-Weighted EMA for when we have un-equal event arrival, but we want to still collect events-over-time.
+class TWEMAStore:
+    """Struct-of-arrays state for many TWEMAs so a full batch of ticker updates runs as one NumPy step.
 
-    (e.g. we can't just have an EMA of "last N data points" because datapoints could be arriving in 250ms or 3 s or 15 s or 300s...
+    State is laid out as [row, series, duration] where each ITicker owns one row and each
+    of its TWEMAs (price, iv, delta, ...) is one series in the row.
+
+    Updates are collected with .stage() while processing a batch of ticker updates, then .apply()
+    runs the time-decay and blend for every staged (row, series) at once instead of looping over
+    every duration of every EMA with math.exp() in Python.
     """
 
-    # EMA durations in seconds
-    # 3,900 seconds is 65 minutes; 23_400 seconds is 6.5 hours (390 minutes)
-    # Added longer periods for trend analysis:
-    # 4,500 = 75min (≈ EMA5 on 15min bars)
-    # 7,200 = 2h (≈ EMA8 on 15min bars)
-    # 18,900 = 5.25h (≈ EMA21 on 15min bars)
-    # 75,600 = 21h (≈ EMA21 on 1h bars)
-    # 180,000 = 50h (≈ EMA50 on 1h bars)
-    durations: tuple[int, ...] = (
-        0,  # we use '0' to mean "last value seen"
-        15,
-        30,
-        60,
-        120,
-        180,
-        300,
-        900,
-        1800,
-        3_900,
-        4_500,      # 75 minutes (≈ EMA5 on 15min bars)
-        7_200,      # 2 hours (≈ EMA8 on 15min bars)
-        18_900,     # 5.25 hours (≈ EMA21 on 15min bars)
-        75_600,     # 21 hours (≈ EMA21 on 1h bars)
-        180_000,    # 50 hours (≈ EMA50 on 1h bars)
-        RTH_EMA_VWAP,
-    )
+    durations: tuple[int, ...] = TWEMA_DURATIONS
+    series: int = 1
+    capacity: int = 64
 
-    # actual EMA values
-    # Dict is format [EMA duration in seconds, EMA value]
-    emas: dict[int, float] = field(default_factory=dict)
+    # [row, series, duration] state
+    emas: np.ndarray = field(init=False)
+    diffVWAP: np.ndarray = field(init=False)
+    diffVWAPLog: np.ndarray = field(init=False)
+    diffPrevLog: np.ndarray = field(init=False)
+    diffPrevLogScoreEMA: np.ndarray = field(init=False)
+    diffVWAPLogScoreEMA: np.ndarray = field(init=False)
 
-    # metadata EMAs
-    diffVWAP: dict[int, float] = field(default_factory=dict)
-    diffVWAPLog: dict[int, float] = field(default_factory=dict)
-    diffPrevLog: dict[int, float] = field(default_factory=dict)
+    # RMS score of each duration (calculated on every update so reading scores is just an index lookup)
+    rms: np.ndarray = field(init=False)
 
-    # metadata scores
-    diffVWAPLogScore: float = 0.0
-    diffPrevLogScore: float = 0.0
+    # [row, series] state
+    diffVWAPLogScore: np.ndarray = field(init=False)
+    diffPrevLogScore: np.ndarray = field(init=False)
+    lastUpdate: np.ndarray = field(init=False)
 
-    # i put emas in ur emas
-    diffVWAPLogScoreEMA: dict[int, float] = field(default_factory=dict)
-    diffPrevLogScoreEMA: dict[int, float] = field(default_factory=dict)
+    # 0 = no values yet; 1 = EMAs populated; 2 = EMAs and difference metadata populated
+    updated: np.ndarray = field(init=False)
+
+    # duration -> column lookups (diffPrevLog never populates the longest duration)
+    index: dict[int, int] = field(init=False)
+    prevIndex: dict[int, int] = field(init=False)
+
+    # 1 / duration for every non-zero duration
+    invPeriods: np.ndarray = field(init=False)
 
-    last_update: float = 0
+    # count of durations up to and including each duration (for prefix means)
+    prefixLengths: np.ndarray = field(init=False)
+
+    rows: int = field(init=False, default=0)
+    free: list[int] = field(init=False, default_factory=list)
+
+    pendingRows: list[int] = field(init=False, default_factory=list)
+    pendingSeries: list[int] = field(init=False, default_factory=list)
+    pendingValues: list[float] = field(init=False, default_factory=list)
+    pendingTimestamps: list[float] = field(init=False, default_factory=list)
+    pendingKeys: set[tuple[int, int]] = field(init=False, default_factory=set)
 
     def __post_init__(self) -> None:
         # Just verify durations are ALWAYS sorted from smallest to largest
         self.durations = tuple(sorted(self.durations))
+        assert self.durations[0] == 0, (
+            "Duration 0 must exist for holding the current value"
+        )
 
-    def update(self, new_value: float | None, timestamp: float) -> None:
-        if new_value is None:
+        self.index = {d: i for i, d in enumerate(self.durations)}
+        self.prevIndex = {d: i for i, d in enumerate(self.durations[:-1])}
+        self.invPeriods = 1 / np.array(self.durations[1:], dtype=np.float64)
+        self.prefixLengths = np.arange(1, len(self.durations) + 1, dtype=np.float64)
+
+        cols = len(self.durations)
+        self.emas = np.zeros((self.capacity, self.series, cols))
+        self.diffVWAP = np.zeros((self.capacity, self.series, cols))
+        self.diffVWAPLog = np.zeros((self.capacity, self.series, cols))
+        self.diffPrevLog = np.zeros((self.capacity, self.series, cols))
+        self.diffPrevLogScoreEMA = np.zeros((self.capacity, self.series, cols))
+        self.diffVWAPLogScoreEMA = np.zeros((self.capacity, self.series, cols))
+        self.rms = np.zeros((self.capacity, self.series, cols))
+        self.diffVWAPLogScore = np.zeros((self.capacity, self.series))
+        self.diffPrevLogScore = np.zeros((self.capacity, self.series))
+        self.lastUpdate = np.zeros((self.capacity, self.series))
+        self.updated = np.zeros((self.capacity, self.series), dtype=np.int8)
+
+    def grow(self) -> None:
+        """Double row capacity while retaining all current state."""
+        extra = self.capacity
+        self.capacity *= 2
+        for name in (
+            "emas",
+            "diffVWAP",
+            "diffVWAPLog",
+            "diffPrevLog",
+            "diffPrevLogScoreEMA",
+            "diffVWAPLogScoreEMA",
+            "rms",
+            "diffVWAPLogScore",
+            "diffPrevLogScore",
+            "lastUpdate",
+            "updated",
+        ):
+            arr = getattr(self, name)
+            setattr(
+                self,
+                name,
+                np.concatenate((arr, np.zeros((extra, *arr.shape[1:]), arr.dtype))),
+            )
+
+    def allocate(self) -> int:
+        """Reserve a row for a new owner and return its row id."""
+        if self.free:
+            row = self.free.pop()
+        else:
+            row = self.rows
+            self.rows += 1
+            if row >= self.capacity:
+                self.grow()
+
+        # previous owners of reused rows may have left state behind, so nothing is populated until the first update.
+        self.updated[row] = 0
+
+        return row
+
+    def release(self, row: int) -> None:
+        """Return a row for re-use by a future owner."""
+        self.updated[row] = 0
+        self.free.append(row)
+
+    def stage(
+        self, row: int, series: int, value: float | None, timestamp: float
+    ) -> None:
+        """Record an update to be applied on the next .apply()"""
+        if value is None:
             return
 
-        if self.last_update == 0:
-            self.last_update = timestamp
+        # if the same EMA is updated twice in one batch, apply the previous update first so updates stay sequential
+        key = (row, series)
+        if key in self.pendingKeys:
+            self.apply()
 
-            for duration in self.durations:
-                self.emas[duration] = new_value
+        self.pendingKeys.add(key)
+        self.pendingRows.append(row)
+        self.pendingSeries.append(series)
+        self.pendingValues.append(value)
+        self.pendingTimestamps.append(timestamp)
 
+    def apply(self) -> None:
+        """Run all staged updates as one vectorized update."""
+        if not self.pendingRows:
             return
 
-        time_diff = timestamp - self.last_update
-        self.last_update = timestamp
+        r = np.array(self.pendingRows, dtype=np.intp)
+        s = np.array(self.pendingSeries, dtype=np.intp)
+        v = np.array(self.pendingValues, dtype=np.float64)
+        t = np.array(self.pendingTimestamps, dtype=np.float64)
+
+        self.pendingRows.clear()
+        self.pendingSeries.clear()
+        self.pendingValues.clear()
+        self.pendingTimestamps.clear()
+        self.pendingKeys.clear()
+
+        state = self.updated[r, s]
+
+        # first value for an EMA just populates every duration with the current value
+        if (first := state == 0).any():
+            fr = r[first]
+            fs = s[first]
+            self.emas[fr, fs] = v[first, None]
+
+            # (all durations have the same value, so there is no difference to score yet)
+            self.rms[fr, fs] = 0
+            self.lastUpdate[fr, fs] = t[first]
+            self.updated[fr, fs] = 1
+
+            rest = ~first
+            r = r[rest]
+            s = s[rest]
+            v = v[rest]
+            t = t[rest]
+            state = state[rest]
+
+            if not len(r):
+                return
+
+        timeDiff = t - self.lastUpdate[r, s]
+        self.lastUpdate[r, s] = t
+
+        # (every blend for an update uses the same decay since they all share the same time difference)
+        alpha = 1 - np.exp(-timeDiff[:, None] * self.invPeriods)
+        remain = 1 - alpha
 
         # update all EMAs
         # Use position 0 to store the current "live" input value without any adjustments.
-        self.emas[0] = new_value
-
-        # skip the 0th entry because we manully write into it
-
-        for period in self.durations[1:]:
-            value = self.emas[period]
-            alpha = 1 - math.exp(-time_diff / period)
-            last = alpha * new_value + (1 - alpha) * value
-            self.emas[period] = last
-
-        # now update difference EMAs:
-        #  - price differences (from previous)
-        #  - difference from VWAP (longest duration)
-        #  - difference from previous
-
-        # can't update logs of negative prices if we init weird
-        # (things like NYSE-TICK have negative "price" ranges)
-        # if last <= 0:
-        #    return
-
-        # VWAP vs. Current comparisons
-        # loglast = math.log(last)
-        self.diffVWAPLogScore = 0.0
-        for k in self.durations:
-            v = self.emas[k]
-
-            # same check against negative prices here too...
-            # if v <= 0:
-            #     return
-
-            # price difference VWAP
-            self.diffVWAP[k] = v - last
-
-            # log difference VWAP
-            # dvl = 100 * (math.log(v) - loglast)
-            dvl = 100 * ((v - last) / (last or 1))
-            self.diffVWAPLog[k] = dvl
-
-            if k > 0:
-                self.diffVWAPLogScore += (1 / k) * dvl
-
-        # Previous vs. Current comparisons
-        # process differences from high to low, so reverse, because
-        # we know the dict keys are _already_ in sorted order from lowest to highest.
-        prev = 0.0
-        self.diffPrevLogScore = 0.0
-        for k in reversed(self.durations):
-            # here = math.log(self.emas[k])
-            here = self.emas[k]
-            if not prev:
-                prev = here
-                continue
+        emas = self.emas[r, s]
+        emas[:, 0] = v
+        emas[:, 1:] = alpha * v[:, None] + remain * emas[:, 1:]
+        self.emas[r, s] = emas
+
+        # RMS score for each duration is the RMS-normalized difference between the current value and
+        # the duration EMA, normalized across all EMAs from the current value up to the duration.
+        # (the RMS of every prefix comes from one cumulative sum, so this is linear in duration count)
+        prefixRMS = np.sqrt(np.cumsum(emas * emas, axis=1) / self.prefixLengths)
+        self.rms[r, s] = (emas[:, :1] - emas) / (prefixRMS + 1e-6)
+
+        # VWAP vs. Current comparisons (against the longest EMA)
+        last = emas[:, -1:]
+        diffVWAP = emas - last
+        diffVWAPLog = 100 * (diffVWAP / np.where(last == 0, 1, last))
+        self.diffVWAP[r, s] = diffVWAP
+        self.diffVWAPLog[r, s] = diffVWAPLog
+        vwapScore = diffVWAPLog[:, 1:] @ self.invPeriods
+
+        # Previous vs. Current comparisons (each duration against the next longer duration).
+        # A zero longer duration can't generate a percentage difference, so those keep their previous value.
+        here = emas[:, :-1]
+        prev = emas[:, 1:]
+        compared = prev != 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diffPrevLog = np.where(
+                compared, 100 * ((here - prev) / prev), self.diffPrevLog[r, s, :-1]
+            )
 
-            # log difference vs previous EMA price
-            dpl = 100 * ((here - prev) / (prev or 1))
-            prev = here
+        self.diffPrevLog[r, s, :-1] = diffPrevLog
+        prevScore = np.where(compared, diffPrevLog, 0)[:, 1:] @ self.invPeriods[:-1]
 
-            self.diffPrevLog[k] = dpl
+        self.diffVWAPLogScore[r, s] = vwapScore
+        self.diffPrevLogScore[r, s] = prevScore
 
-            if k > 0:
-                self.diffPrevLogScore += (1 / k) * dpl
+        # now update difference EMAs (or, if first run, just set all of them then wait for more updates)
+        seed = (state == 1)[:, None]
+        for scores, score in (
+            (self.diffPrevLogScoreEMA, prevScore),
+            (self.diffVWAPLogScoreEMA, vwapScore),
+        ):
+            current = scores[r, s]
+            current[:, 1:] = np.where(
+                seed, score[:, None], alpha * score[:, None] + remain * current[:, 1:]
+            )
 
-        self.updateDiffEMAs(time_diff)
+            # set current values as position zero...
+            current[:, 0] = score
+            scores[r, s] = current
 
-    def updateDiffEMAs(self, time_diff: float):
-        prevLog = self.diffPrevLogScore
-        vwapLog = self.diffVWAPLogScore
+        self.updated[r, s] = 2
 
-        # if first run, just set both of them then wait for more updates
-        if not self.diffPrevLogScoreEMA:
-            for duration in self.durations:
-                self.diffPrevLogScoreEMA[duration] = prevLog
-                self.diffVWAPLogScoreEMA[duration] = vwapLog
 
-            return
+class TWEMAView(Mapping):
+    """Read-only {duration: value} mapping over one TWEMA slot of a TWEMAStore array."""
 
-        durationsWithoutZero = self.durations[1:]
+    __slots__ = ("store", "attr", "row", "series", "index", "ready")
 
-        # update all EMAs
-        for period in durationsWithoutZero:
-            value = self.diffPrevLogScoreEMA[period]
-            alpha = 1 - math.exp(-time_diff / period)
-            self.diffPrevLogScoreEMA[period] = last = (
-                alpha * prevLog + (1 - alpha) * value
-            )
+    def __init__(
+        self,
+        store: TWEMAStore,
+        attr: str,
+        row: int,
+        series: int,
+        index: dict[int, int],
+        ready: int,
+    ) -> None:
+        self.store = store
+        self.attr = attr
+        self.row = row
+        self.series = series
+        self.index = index
+        self.ready = ready
 
-        for period in durationsWithoutZero:
-            value = self.diffVWAPLogScoreEMA[period]
-            alpha = 1 - math.exp(-time_diff / period)
-            self.diffVWAPLogScoreEMA[period] = last = (
-                alpha * vwapLog + (1 - alpha) * value
-            )
+    def __getitem__(self, duration: int) -> float:
+        if self.store.updated[self.row, self.series] < self.ready:
+            raise KeyError(duration)
 
-        # set current values as position zero...
-        self.diffPrevLogScoreEMA[0] = prevLog
-        self.diffVWAPLogScoreEMA[0] = vwapLog
+        return float(
+            getattr(self.store, self.attr)[self.row, self.series, self.index[duration]]
+        )
 
-    def __getitem__(self, idx) -> float:
-        return self.emas.get(idx, 0)
+    def __iter__(self):
+        if self.store.updated[self.row, self.series] < self.ready:
+            return iter(())
 
-    def get(self, idx, default=None) -> float:
-        return self.emas.get(idx, default)
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        if self.store.updated[self.row, self.series] < self.ready:
+            return 0
+
+        return len(self.index)
+
+
+@dataclass(slots=True)
+class TWEMA:
+    """Time-Weighted EMA for when we have un-equal event arrival, but we want to still collect events-over-time.
+
+    (e.g. we can't just have an EMA of "last N data points" because datapoints could be arriving in 250ms or 3 s or 15 s or 300s...
+
+    The actual EMA state lives in a TWEMAStore (so many TWEMAs can be updated in one batch), and this is just
+    a handle to one (row, series) slot of the store. If no store is provided, we get a private single-slot store.
+    """
+
+    store: TWEMAStore = field(default_factory=TWEMAStore)
+    row: int = -1
+    series: int = 0
+
+    def __post_init__(self) -> None:
+        if self.row < 0:
+            self.row = self.store.allocate()
+
+    @property
+    def durations(self) -> tuple[int, ...]:
+        return self.store.durations
+
+    # actual EMA values
+    # Mapping is format [EMA duration in seconds, EMA value]
+    @property
+    def emas(self) -> TWEMAView:
+        return TWEMAView(self.store, "emas", self.row, self.series, self.store.index, 1)
+
+    # metadata EMAs
+    @property
+    def diffVWAP(self) -> TWEMAView:
+        return TWEMAView(
+            self.store, "diffVWAP", self.row, self.series, self.store.index, 2
+        )
+
+    @property
+    def diffVWAPLog(self) -> TWEMAView:
+        return TWEMAView(
+            self.store, "diffVWAPLog", self.row, self.series, self.store.index, 2
+        )
+
+    @property
+    def diffPrevLog(self) -> TWEMAView:
+        return TWEMAView(
+            self.store, "diffPrevLog", self.row, self.series, self.store.prevIndex, 2
+        )
+
+    # metadata scores
+    @property
+    def diffVWAPLogScore(self) -> float:
+        return float(self.store.diffVWAPLogScore[self.row, self.series])
+
+    @property
+    def diffPrevLogScore(self) -> float:
+        return float(self.store.diffPrevLogScore[self.row, self.series])
 
-    def rms(self) -> dict[int, float]:
-        """Calculate RMS for each slice of the EMAs going higher and higher"""
+    # i put emas in ur emas
+    @property
+    def diffVWAPLogScoreEMA(self) -> TWEMAView:
+        return TWEMAView(
+            self.store,
+            "diffVWAPLogScoreEMA",
+            self.row,
+            self.series,
+            self.store.index,
+            2,
+        )
 
-        # verify order is correct for our math to work
-        # This is just walking a [(lookback, ema)] list of stuff in depth-adjusted inputs all the way down.
-        sema = sorted(self.emas.items(), reverse=True)
+    @property
+    def diffPrevLogScoreEMA(self) -> TWEMAView:
+        return TWEMAView(
+            self.store,
+            "diffPrevLogScoreEMA",
+            self.row,
+            self.series,
+            self.store.index,
+            2,
+        )
 
-        def genscore(threshold):
-            """Generate an adaptive end-start RMS score for each step of the EMA lookback"""
-            use = list(filter(lambda x: x[0] <= threshold, sema))
+    @property
+    def last_update(self) -> float:
+        return float(self.store.lastUpdate[self.row, self.series])
 
-            # if only one element matched, we can't compare it against itself, so the result is always zero.
-            if len(use) == 1:
-                return 0
+    def stage(self, new_value: float | None, timestamp: float) -> None:
+        """Queue an update to run with the next batch update of our store."""
+        self.store.stage(self.row, self.series, new_value, timestamp)
 
-            _idxs, emas = zip(*use)
-            scores = rmsnorm(emas)
-            return scores[-1] - scores[0]
+    def update(self, new_value: float | None, timestamp: float) -> None:
+        self.store.stage(self.row, self.series, new_value, timestamp)
+        self.store.apply()
 
-        scores = {}
-        for k, v in sema:
-            scores[k] = genscore(k)
+    def __getitem__(self, idx) -> float:
+        return self.get(idx, 0)
+
+    def get(self, idx, default=None) -> float:
+        store = self.store
+        col = store.index.get(idx)
+        if col is None or not store.updated[self.row, self.series]:
+            return default
 
-        return scores
+        return float(store.emas[self.row, self.series, col])
+
+    def rms(self) -> TWEMAView:
+        """RMS score for each slice of the EMAs going higher and higher.
+
+        Each duration's score is the RMS-normalized (end - start) difference across all EMAs
+        from the current value up to the duration. Scores are calculated by the store on every
+        update, so this is only a view of the current scores."""
+        return TWEMAView(self.store, "rms", self.row, self.series, self.store.index, 1)
 
     def logScoreFrame(self, digits: int = 2) -> pd.DataFrame:
         rms = self.rms()
         return pd.DataFrame(
             dict(
-                prevlog={k: round(v, 4) for k, v in reversed(self.diffPrevLog.items())},
+                prevlog={k: round(v, 4) for k, v in self.diffPrevLog.items()},
                 prevscore={k: v * 1000 for k, v in self.diffPrevLogScoreEMA.items()},
                 vwaplog={k: round(v, 4) for k, v in self.diffVWAPLog.items()},
                 vwapscore={k: v * 1000 for k, v in self.diffVWAPLogScoreEMA.items()},
@@ -644,6 +1134,64 @@ class QuoteSizes:
         return ask if ask is not None else self.last
 
 
+@dataclass(slots=True)
+class SessionClock:
+    """Market session boundaries as epoch floats so per-tick session checks are just float comparisons.
+
+    Boundaries describe the current session (or the next session if the market is currently closed)
+    and regenerate automatically after the current session closes. Sessions come from the market
+    calendar, so early-close days report their actual (early) close.
+    """
+
+    calendar: str = "NASDAQ"
+
+    # current (or next, if currently closed) regular trading hours session
+    open: float = 0.0
+    or30: float = 0.0
+    close: float = 0.0
+
+    # session after the current session
+    nextOpen: float = 0.0
+    nextClose: float = 0.0
+
+    # date of the current session as YYYYMMDD (same format as contract expiration dates)
+    sessionDate: str = ""
+
+    def refresh(self, now: float) -> None:
+        """Regenerate session boundaries for the first session not yet closed at 'now'."""
+        start = pd.Timestamp(now, unit="s", tz="US/Eastern").floor("D")
+
+        # (10 days ahead always covers at least two sessions, even across long holiday weekends)
+        found = tcal.getMarketCalendar(
+            self.calendar, start=start, stop=start + pd.Timedelta(10, "D")
+        )
+
+        sessions = [
+            (marketOpen, marketClose)
+            for marketOpen, marketClose in zip(found.market_open, found.market_close)
+            if marketClose.timestamp() > now
+        ]
+
+        (currentOpen, currentClose), (nextOpen, nextClose) = sessions[:2]
+
+        self.open = currentOpen.timestamp()
+        self.or30 = self.open + 30 * 60
+        self.close = currentClose.timestamp()
+        self.nextOpen = nextOpen.timestamp()
+        self.nextClose = nextClose.timestamp()
+        self.sessionDate = currentOpen.tz_convert("US/Eastern").strftime("%Y%m%d")
+
+    def update(self, now: float | None = None) -> SessionClock:
+        """Return the clock after moving to the next session if the current session closed."""
+        if now is None:
+            now = time.time()
+
+        if now >= self.close:
+            self.refresh(now)
+
+        return self
+
+
 @dataclass(slots=True)
 class LevelLevels:
     """Store a mapping of type (sma, volume?, etc?) and lookback duration (seconds) to level breaching price (price)."""
@@ -682,6 +1230,164 @@ class LevelBreacher:
         self.durationName = convert_time(self.duration)
 
 
+@dataclass(slots=True)
+class LevelIndex:
+    """All enabled levels of all LevelBreachers for one instrument sorted by level price.
+
+    Sorting lets us find every level crossed between two prices using two bisects instead of
+    comparing prices against every level of every breacher on every update.
+    """
+
+    # level prices in sorted order
+    prices: list[float] = field(default_factory=list)
+
+    # (breacher, level) for each price in 'prices'
+    entries: list[tuple[LevelBreacher, LevelLevels]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def add(self, breacher: LevelBreacher) -> None:
+        """Add all levels of 'breacher' to the index."""
+        for level in breacher.levels:
+            pos = bisect.bisect_right(self.prices, level.level)
+            self.prices.insert(pos, level.level)
+            self.entries.insert(pos, (breacher, level))
+
+    def remove(self, breacher: LevelBreacher) -> None:
+        """Remove all levels of 'breacher' from the index."""
+        for level in breacher.levels:
+            start = bisect.bisect_left(self.prices, level.level)
+            end = bisect.bisect_right(self.prices, level.level, start)
+            for pos in range(start, end):
+                if self.entries[pos][1] is level:
+                    del self.prices[pos]
+                    del self.entries[pos]
+                    break
+
+    def between(
+        self, low: float, high: float
+    ) -> list[tuple[LevelBreacher, LevelLevels]]:
+        """Return all levels where low <= level <= high in ascending price order."""
+        start = bisect.bisect_left(self.prices, low)
+        end = bisect.bisect_right(self.prices, high, start)
+        return self.entries[start:end]
+
+
+@dataclass(slots=True)
+class QuoteIndex:
+    """All live quotes in display order, maintained as quotes are added and removed.
+
+    Each quote's sort order is calculated once when added, so displaying quotes in order is just
+    iterating 'entries' instead of re-sorting every quote on every toolbar refresh.
+    """
+
+    # sort order of each quote key
+    orders: dict[Hashable, tuple] = field(default_factory=dict)
+
+    # quote sort orders in sorted order
+    keys: list[tuple] = field(default_factory=list)
+
+    # (quote key, ITicker) for each order in 'keys'
+    entries: list[tuple[Hashable, ITicker]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, quotekey: Hashable, iticker: ITicker, order: tuple) -> None:
+        """Add 'iticker' under 'quotekey' at position 'order' (replacing any previous entry for 'quotekey')."""
+        self.remove(quotekey)
+
+        # equal orders keep insertion order
+        pos = bisect.bisect_right(self.keys, order)
+        self.keys.insert(pos, order)
+        self.entries.insert(pos, (quotekey, iticker))
+        self.orders[quotekey] = order
+
+    def remove(self, quotekey: Hashable) -> None:
+        """Remove 'quotekey' from the index (if present)."""
+        if (order := self.orders.pop(quotekey, None)) is None:
+            return
+
+        start = bisect.bisect_left(self.keys, order)
+        end = bisect.bisect_right(self.keys, order, start)
+        for pos in range(start, end):
+            if self.entries[pos][0] == quotekey:
+                del self.keys[pos]
+                del self.entries[pos]
+                break
+
+    def clear(self) -> None:
+        self.orders.clear()
+        self.keys.clear()
+        self.entries.clear()
+
+
+@dataclass(slots=True)
+class PositionOverlay:
+    """Current positions of one account by contract id, maintained from IBKR portfolio and position events.
+
+    Rows are immutable PortfolioItems replaced on every update, so readers can also compare a row
+    against a previously seen row to detect position changes.
+
+    Position events arrive immediately after fills while portfolio events may arrive minutes later,
+    so positions only seen through position events have nan market values until the portfolio catches up.
+    """
+
+    accountId: str
+
+    rows: dict[int, PortfolioItem] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, conId: int) -> PortfolioItem | None:
+        return self.rows.get(conId)
+
+    def portfolio(self, item: PortfolioItem) -> None:
+        """Update from an IBKR portfolio update."""
+        if item.account != self.accountId:
+            return
+
+        if item.position:
+            self.rows[item.contract.conId] = item
+        else:
+            self.rows.pop(item.contract.conId, None)
+
+    def position(self, position: Position) -> None:
+        """Update from an IBKR position update."""
+        if position.account != self.accountId:
+            return
+
+        conId = position.contract.conId
+        if not position.position:
+            self.rows.pop(conId, None)
+            return
+
+        # API TRICK: "position" objects have 'avgCost' while "portfolio" objects have 'averageCost'
+        if row := self.rows.get(conId):
+            self.rows[conId] = row._replace(
+                position=position.position, averageCost=position.avgCost
+            )
+        else:
+            self.rows[conId] = PortfolioItem(
+                contract=position.contract,
+                position=position.position,
+                marketPrice=nan,
+                marketValue=nan,
+                averageCost=position.avgCost,
+                unrealizedPNL=nan,
+                realizedPNL=nan,
+                account=position.account,
+            )
+
+    def reset(self, items: Iterable[PortfolioItem]) -> None:
+        """Replace all rows with 'items' (used when (re)connecting)."""
+        self.rows.clear()
+        for item in items:
+            self.portfolio(item)
+
+
 @dataclass(slots=True, frozen=True)
 class QuoteFlowPoint:
     bid: float
@@ -696,80 +1402,626 @@ class QuoteFlow:
     This helps us see how quickly prices are moving.
 
     The goal is to detect how quickly bids are growing larger than previous asks (or the opposite, when asks are falling below bids).
+
+    Breaches are detected as each update arrives and kept with running totals per price range, so analyze() only
+    reports the current totals instead of walking the full history. Breaches expire when the update generating them
+    falls out of the 'pairs' history (the breach chain itself continues across expiry instead of restarting at the
+    oldest retained update).
     """
 
     # a 1,200 entry history gives us 5 minutes of price history at 250 ms updates
     pairs: deque[QuoteFlowPoint] = field(default_factory=lambda: deque(maxlen=1_200))
 
+    ranges: tuple[float, ...] = (0, 0.5, 1, 3, 5, 15)
+
+    # mapping of price difference to previous point seen for next comparison
+    prevpoints: dict[float, QuoteFlowPoint] = field(default_factory=dict)
+
+    # breaches as (update sequence, seconds since previous breach) per price range, oldest first
+    updoot: dict[float, deque[tuple[int, float]]] = field(
+        default_factory=lambda: defaultdict(deque)
+    )
+    downdoot: dict[float, deque[tuple[int, float]]] = field(
+        default_factory=lambda: defaultdict(deque)
+    )
+
+    # running sum of breach seconds per price range (for mean speeds)
+    uptotal: dict[float, float] = field(default_factory=lambda: defaultdict(float))
+    downtotal: dict[float, float] = field(default_factory=lambda: defaultdict(float))
+
+    # count of updates received (used to expire breaches as their update leaves 'pairs')
+    updated: int = 0
+
     def update(self, bid, ask, timestamp):
-        """Save the current bid/ask/timestamp into our history for analyzing price direction."""
-        self.pairs.append(QuoteFlowPoint(bid, ask, timestamp))
+        """Save the current bid/ask/timestamp into our history and record any new breaches for analyzing price direction."""
+        seq = self.updated
+        self.updated += 1
+
+        qfp = QuoteFlowPoint(bid, ask, timestamp)
+        self.pairs.append(qfp)
+
+        # expire breaches generated by the update which just fell out of the history
+        expired = seq - (self.pairs.maxlen or seq + 1)
+        if expired >= 0:
+            for doots, totals in (
+                (self.updoot, self.uptotal),
+                (self.downdoot, self.downtotal),
+            ):
+                for r, doot in doots.items():
+                    if doot and doot[0][0] <= expired:
+                        _, elapsed = doot.popleft()
 
-    def analyze(self):
-        """Walk every recorded 'pairs' to figure out how long it takes for either a bid to become the ask or an ask to become a bid."""
+                        # reset instead of subtracting the final breach so float error doesn't accumulate forever
+                        totals[r] = totals[r] - elapsed if doot else 0.0
 
-        if not self.pairs:
-            return defaultdict(float)
+        # only attempt to use valid quotes
+        if not (bid and ask):
+            return
+
+        prevpoints = self.prevpoints
 
-        # mapping of price difference to previous point seen for next comparison
-        prevpoints: dict[float, QuoteFlowPoint] = {}
+        # if this is the first attempt, we want to initialize every previous value with the current value
+        if not prevpoints:
+            for r in self.ranges:
+                prevpoints[r] = qfp
 
-        updoot: dict[float, list[float]] = defaultdict(list)
-        downdoot: dict[float, list[float]] = defaultdict(list)
-        ranges = (0, 0.5, 1, 3, 5, 15)
-        for p in self.pairs:
-            match p:
-                case QuoteFlowPoint(bid=bid, ask=ask, timestamp=timestamp) as qfp:
-                    # only attempt to use valid quotes
-                    if not (bid and ask):
-                        continue
+            return
 
-                    # if this is the first attempt, we want to initialize every previous value with the current value
-                    if not prevpoints:
-                        for r in ranges:
-                            prevpoints[r] = qfp
+        for r in self.ranges:
+            prevpoint = prevpoints[r]
 
-                        continue
+            if bid - prevpoint.ask >= r:
+                # price is RISING because bid is now above PREVIOUS ASK
+                elapsed = timestamp - prevpoint.timestamp
+                self.updoot[r].append((seq, elapsed))
+                self.uptotal[r] += elapsed
 
-                    for r in ranges:
-                        prevpoint = prevpoints[r]
+                # update previous point since we USED it for date (otherwise the intermediate parts didn't breach)
+                prevpoints[r] = qfp
+            elif prevpoint.bid - ask >= r:
+                # price is FALLING because previous ask is BELOW current BID
+                elapsed = timestamp - prevpoint.timestamp
+                self.downdoot[r].append((seq, elapsed))
+                self.downtotal[r] += elapsed
+                prevpoints[r] = qfp
 
-                        if bid - prevpoint.ask >= r:
-                            # price is RISING because bid is now above PREVIOUS ASK
-                            updoot[r].append(timestamp - prevpoint.timestamp)
+    def analyze(self):
+        """Report how long it takes for either a bid to become the ask or an ask to become a bid across our history."""
 
-                            # update previous point since we USED it for date (otherwise the intermediate parts didn't breach)
-                            prevpoints[r] = qfp
-                        elif prevpoint.bid - ask >= r:
-                            # price is FALLING because previous ask is BELOW current BID
-                            downdoot[r].append(timestamp - prevpoint.timestamp)
-                            prevpoints[r] = qfp
+        if not self.pairs:
+            return defaultdict(float)
 
         # return time between last data (most recent) and first data (oldest)
         duration = self.pairs[-1].timestamp - self.pairs[0].timestamp
 
-        upspeeds: dict[float, float] = dict()
-        for r, l in updoot.items():
-            upspeeds[r] = statistics.mean(l)
-
-        downspeeds: dict[float, float] = dict()
-        for r, l in downdoot.items():
-            downspeeds[r] = statistics.mean(l)
-
         # TODO: also include stats about the DISTANCE of the breaches (0.10 cents? $10? we need to be generating better sub-stats per price range)
         # TODO: we ALSO need to populate a metric for "the current trend" if prices are NOW moving up (or the last timestamp a price moved up or down individually)
         # TODO: also try to not double count the same side if conditions remain in-range but not moving?
         # TODO: return this as a dataframe? rows are the price blocks, columns are uplen/upspeed/downlen/downspeed?
         return dict(
             duration=duration,
-            uplen={k: len(v) for k, v in updoot.items()},
-            upspeed=upspeeds,
-            downlen={k: len(v) for k, v in downdoot.items()},
-            downspeed=downspeeds,
+            uplen={k: len(v) for k, v in self.updoot.items() if v},
+            upspeed={k: self.uptotal[k] / len(v) for k, v in self.updoot.items() if v},
+            downlen={k: len(v) for k, v in self.downdoot.items() if v},
+            downspeed={
+                k: self.downtotal[k] / len(v) for k, v in self.downdoot.items() if v
+            },
+        )
+
+
+@dataclass(slots=True)
+class RollingStats:
+    """A fixed-length value history maintaining its own statistics as values arrive.
+
+    Instead of running statistics.stdev()/quantiles() and min()/max() over the full history
+    every time we want to report on it, we keep a sorted copy of the history (for exact quantiles
+    and O(1) min/max) plus a running mean/variance updated as values enter and leave the window.
+
+    Iterating and len() work the same as the previous plain deque history.
+    """
+
+    maxlen: int = 240
+
+    # values in arrival order
+    values: deque[float] = field(init=False)
+
+    # values in sorted order
+    ordered: list[float] = field(init=False, default_factory=list)
+
+    # running (Welford) mean and sum of squared differences from the mean
+    mean: float = 0.0
+    m2: float = 0.0
+
+    # appends since the running mean/variance was last recalculated from scratch
+    drift: int = 0
+
+    # quantiles by 'n' generated since the most recent append
+    quantileCache: dict[int, tuple[float, ...]] = field(
+        init=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        self.values = deque(maxlen=self.maxlen)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def append(self, value: float) -> None:
+        # NaN can't be sorted or averaged, so ignore it instead of breaking every statistic forever
+        if value != value:
+            return
+
+        values = self.values
+        ordered = self.ordered
+
+        if len(values) == self.maxlen:
+            old = values.popleft()
+            del ordered[bisect.bisect_left(ordered, old)]
+
+            count = len(values) + 1
+            if count == 1:
+                self.mean = 0.0
+                self.m2 = 0.0
+            else:
+                mean = (count * self.mean - old) / (count - 1)
+                self.m2 -= (old - self.mean) * (old - mean)
+                self.mean = mean
+
+        values.append(value)
+        bisect.insort(ordered, value)
+
+        delta = value - self.mean
+        self.mean += delta / len(values)
+        self.m2 += delta * (value - self.mean)
+
+        # removing values from a running variance accumulates float error over time,
+        # so regenerate from the current window once per full window of updates.
+        self.drift += 1
+        if self.drift >= self.maxlen:
+            self.drift = 0
+            self.mean = math.fsum(values) / len(values)
+            self.m2 = math.fsum((x - self.mean) ** 2 for x in values)
+
+        self.quantileCache.clear()
+
+    @property
+    def min(self) -> float:
+        return self.ordered[0]
+
+    @property
+    def max(self) -> float:
+        return self.ordered[-1]
+
+    @property
+    def range(self) -> float:
+        """Difference between the highest and lowest values (0 if no values yet)."""
+        if not self.ordered:
+            return 0
+
+        return self.ordered[-1] - self.ordered[0]
+
+    def stdev(self) -> float:
+        """Sample standard deviation of the history (same as statistics.stdev())"""
+        if len(self.values) < 2:
+            raise statistics.StatisticsError("stdev requires at least two data points")
+
+        return math.sqrt(max(self.m2, 0) / (len(self.values) - 1))
+
+    def quantiles(self, n: int = 4) -> tuple[float, ...]:
+        """Cut points dividing the history into 'n' intervals (same as statistics.quantiles(method="inclusive"))"""
+        if found := self.quantileCache.get(n):
+            return found
+
+        data = self.ordered
+        ld = len(data)
+        if ld < 2:
+            raise statistics.StatisticsError("must have at least two data points")
+
+        m = ld - 1
+        result = []
+        for i in range(1, n):
+            j, delta = divmod(i * m, n)
+            result.append((data[j] * (n - delta) + data[j + 1] * delta) / n)
+
+        # (tuple because cached results are shared by every caller until the next update)
+        found = self.quantileCache[n] = tuple(result)
+        return found
+
+
+# ITicker attributes for each TWEMA series stored in the shared TWEMAStore row of the ITicker
+TICKER_EMA_SERIES: Final = (
+    "ema",
+    "emaIV",
+    "emaDelta",
+    "emaVega",
+    "emaTradeRate",
+    "emaVolumeRate",
+)
+
+# ifthen EMA source names (the first component of a "source:..." predicate field) to ITicker EMA attributes
+EMA_SOURCES: Final = {
+    "price": "ema",
+    "p": "ema",
+    "trade": "emaTradeRate",
+    "tr": "emaTradeRate",
+    "volume": "emaVolumeRate",
+    "vol": "emaVolumeRate",
+    "iv": "emaIV",
+    "delta": "emaDelta",
+    "d": "emaDelta",
+    "vega": "emaVega",
+    "v": "emaVega",
+}
+
+# Optional per-ticker indicator pipelines which only update while something demands them.
+# ("ema" also gates the EMA-dependent alerting in ITicker.completeTickerUpdate())
+TICKER_INDICATORS: Final = frozenset(
+    {"atrs", "quoteflow", "history", *TICKER_EMA_SERIES}
+)
+
+
+@dataclass(slots=True)
+class IndicatorDemand:
+    """Registry of which optional ticker indicators each consumer needs for each quote key.
+
+    Each consumer (predicates, toolbar, reporter, alerts, ...) declares its own demand as a mapping of
+    quote key to indicator names from TICKER_INDICATORS, then apply() enables exactly the union of all
+    demands on each ticker. Tickers nobody demands anything from only run their basic quote updates."""
+
+    # consumer name -> quote key -> indicators needed
+    consumers: dict[str, dict[str, frozenset[str]]] = field(default_factory=dict)
+
+    def declare(self, consumer: str, demand: Mapping[str, Iterable[str]]) -> None:
+        """Replace all demand for 'consumer' with 'demand'."""
+        self.consumers[consumer] = {k: frozenset(v) for k, v in demand.items() if v}
+
+    def extend(self, consumer: str, demand: Mapping[str, Iterable[str]]) -> None:
+        """Add 'demand' to any existing demand for 'consumer'."""
+        current = self.consumers.setdefault(consumer, {})
+        for k, v in demand.items():
+            current[k] = current.get(k, frozenset()) | frozenset(v)
+
+    def withdraw(self, consumer: str) -> None:
+        """Remove all demand for 'consumer'."""
+        self.consumers.pop(consumer, None)
+
+    def request(
+        self, consumer: str, itickers: Mapping[str, ITicker], indicators: frozenset[str]
+    ) -> dict[str, frozenset[str]]:
+        """Add demand for 'indicators' on each ticker in 'itickers' (by quote key) and enable them now.
+
+        Returns the indicators each quote key didn't have enabled yet (which only start collecting now)."""
+        self.extend(consumer, {key: indicators for key in itickers})
+        fresh = {
+            key: missing
+            for key, iticker in itickers.items()
+            if (missing := indicators - iticker.indicators)
+        }
+
+        self.apply(itickers)
+        return fresh
+
+    def demanded(self, key: str) -> frozenset[str]:
+        """Return all indicators any consumer needs for quote key 'key'."""
+        return frozenset().union(
+            *[demand[key] for demand in self.consumers.values() if key in demand]
         )
 
+    def apply(self, quoteState: Mapping[str, ITicker]) -> None:
+        """Enable and disable indicator pipelines of every ticker in 'quoteState' to match current demand."""
+        for key, iticker in quoteState.items():
+            iticker.indicatorsSet(self.demanded(key))
+
+
+# Indicators read by commands reporting on quotes. Each command declares its demand for the quotes it
+# reports on when run, so indicators keep updating for its later runs.
+COMMAND_INDICATORS: Final = {
+    # EMA crossovers and VWAP distances, plus quoteflow analysis
+    "advice": frozenset({"ema", "quoteflow"}),
+    # price, trade rate, volume rate, IV, and delta EMA stats, plus quoteflow analysis
+    "info": frozenset(
+        {"ema", "emaTradeRate", "emaVolumeRate", "emaIV", "emaDelta", "quoteflow"}
+    ),
+    # EMA trends of each reported symbol (VIX only needs "ema")
+    "reporter": frozenset({"ema", "emaTradeRate", "emaVolumeRate"}),
+}
+
+
+def toolbarIndicators(contract: Contract, preset: str) -> frozenset[str]:
+    """Return indicators the toolbar row for 'contract' shows under display 'preset'."""
+    need = set()
+
+    # every quote row shows EMA trends and VWAP (which falls back to EMA) except the minimal preset
+    if preset != "minimal":
+        need.add("ema")
+
+    # spread rows show ranges of recent history (and spread high/low tracking uses EMAs)
+    if isinstance(contract, Bag):
+        need |= {"history", "ema"}
+    elif preset == "trading" and not isinstance(contract, (Option, FuturesOption)):
+        # stock/future rows in the trading preset show the 1 hour ATR
+        need.add("atrs")
+
+    return frozenset(need)
+
+
+def alertIndicators(contract: Contract, levels: bool) -> frozenset[str]:
+    """Return indicators ITicker.completeTickerUpdate() alerting reads for 'contract' (with 'levels' if it has levels)."""
+    # futures run rapid move alerts using EMAs and ATRs (plus EMA cross alerts)
+    if isinstance(contract, Future):
+        return frozenset({"ema", "atrs"})
+
+    # options and spreads run EMA cross alerts and premium change alerts, and VWAP/level alerts need EMAs
+    if levels or isinstance(contract, (Option, FuturesOption, Bag)):
+        return frozenset({"ema"})
+
+    return frozenset()
+
+
+class ExtractorError:
+    """Exception raised by a fetcher while capturing an ExtractorTable snapshot (re-raised when read)."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+# ExtractorTable.capture() snapshot ExtractorSlot reads use instead of live values (only set by the PredicateWorker
+# thread while it evaluates predicates, so everything else reading extractors always reads live values)
+EXTRACTOR_SNAPSHOT: contextvars.ContextVar[dict[int, Any] | None] = (
+    contextvars.ContextVar("EXTRACTOR_SNAPSHOT", default=None)
+)
+
+
+class ExtractorSlot:
+    """Predicate data fetcher reading one slot of an ExtractorTable.
+
+    Tables free slots no predicate reads anymore (and reuse them for new keys), so each fetcher also
+    remembers the 'version' of its slot and how to compile its slot again if it was freed."""
+
+    __slots__ = ("table", "slot", "version", "key", "builder")
+
+    def __init__(
+        self,
+        table: ExtractorTable,
+        slot: int,
+        key: tuple[int, str, int],
+        builder: Callable[[], Callable[..., Any] | None],
+    ) -> None:
+        self.table = table
+        self.slot = slot
+        self.version = table.versions[slot]
+        self.key = key
+        self.builder = builder
+
+    def current(self) -> int:
+        """Return our slot (compiling our key into a new slot first if our slot was freed)."""
+        if self.table.versions[self.slot] != self.version:
+            if not (found := self.table.compile(self.key, self.builder)):
+                raise ValueError(f"No data source for {self.key}")
+
+            self.slot = found.slot
+            self.version = found.version
+
+        return self.slot
+
+    def __call__(self, *args) -> Any:
+        table = self.table
+
+        # when evaluating from a snapshot, only read the snapshot
+        # (slots created after the snapshot was captured have no value until the next snapshot)
+        if (snapshot := EXTRACTOR_SNAPSHOT.get()) is not None:
+            slot = self.slot
+            if table.versions[slot] != self.version:
+                return None
+
+            val = snapshot.get(slot)
+            if isinstance(val, ExtractorError):
+                raise val.error
+
+            return val
+
+        slot = self.current()
+        if table.epochs[slot] != table.epoch:
+            table.values[slot] = table.fetchers[slot]()  # type: ignore
+            table.epochs[slot] = table.epoch
+
+        return table.values[slot]
+
+
+@dataclass(slots=True)
+class ExtractorTable:
+    """Shared value table for predicate data extractors.
+
+    Every distinct (source, field, timeframe) used by any predicate compiles to one slot here, so
+    predicates reading the same field all share one fetcher. Each slot value is fetched at most once
+    per epoch (one ticker processing pass), then every other read in the same epoch is a list lookup.
+
+    Slots no predicate reads anymore are freed by retain() (so their fetchers stop holding tickers)."""
+
+    # (source id, field, timeframe) -> slot
+    slots: dict[tuple[int, str, int], int] = field(default_factory=dict)
+
+    keys: list[tuple[int, str, int] | None] = field(default_factory=list)
+    fetchers: list[Callable[..., Any] | None] = field(default_factory=list)
+    values: list[Any] = field(default_factory=list)
+    epochs: list[int] = field(default_factory=list)
+
+    # incremented each time a slot is freed, so fetchers of freed slots know to compile again
+    versions: list[int] = field(default_factory=list)
+
+    # freed slots available for new keys
+    free: list[int] = field(default_factory=list)
+
+    # quote key -> slots read by all predicates checked for the quote key (captured by capture())
+    reads: dict[str, frozenset[int]] = field(default_factory=dict)
+
+    epoch: int = 0
+
+    def compile(
+        self,
+        key: tuple[int, str, int],
+        builder: Callable[[], Callable[..., Any] | None],
+    ) -> ExtractorSlot | None:
+        """Return a fetcher for the slot of 'key', using 'builder' to create the real fetcher if 'key' is new.
+
+        Returns None if 'builder' can't create a fetcher."""
+        if (slot := self.slots.get(key)) is None:
+            if not (fetcher := builder()):
+                return None
+
+            if self.free:
+                slot = self.free.pop()
+                self.keys[slot] = key
+                self.fetchers[slot] = fetcher
+                self.values[slot] = None
+                self.epochs[slot] = -1
+            else:
+                slot = len(self.fetchers)
+                self.keys.append(key)
+                self.fetchers.append(fetcher)
+                self.values.append(None)
+                self.epochs.append(-1)
+                self.versions.append(0)
+
+            self.slots[key] = slot
+
+        return ExtractorSlot(self, slot, key, builder)
+
+    def retain(self, used: Iterable[int]) -> int:
+        """Free every slot not in 'used' (the slots of all current predicates). Returns how many slots were freed."""
+        used = set(used)
+        unused = [slot for slot in self.slots.values() if slot not in used]
+        for slot in unused:
+            del self.slots[self.keys[slot]]  # type: ignore
+            self.keys[slot] = None
+            self.fetchers[slot] = None
+            self.values[slot] = None
+            self.versions[slot] += 1
+            self.free.append(slot)
+
+        return len(unused)
+
+    def advance(self) -> None:
+        """Start a new epoch so every slot fetches again on its next read."""
+        self.epoch += 1
+
+    def capture(self, keys: Iterable[str]) -> dict[int, Any]:
+        """Fetch slots read by predicates checked for quote 'keys' now and return them as a snapshot of slot -> value.
+
+        Snapshots are never modified after capture, so they are safe to read from other threads."""
+        reads = self.reads
+        fetchers = self.fetchers
+        values: dict[int, Any] = {}
+        for key in keys:
+            for slot in reads.get(key, ()):
+                if slot in values:
+                    continue
+
+                try:
+                    values[slot] = fetchers[slot]()  # type: ignore
+                except Exception as e:
+                    values[slot] = ExtractorError(e)
+
+        return values
+
 
 @dataclass(slots=True)
+class PredicateWorker:
+    """Run ifthen predicate checks on a dedicated thread instead of on the event loop.
+
+    Each ticker processing pass submits the quote keys it updated along with an ExtractorTable snapshot
+    captured on the event loop, so the worker thread never reads live tickers. If the worker is still
+    busy when more updates arrive, they are merged and submitted together as soon as the worker is free.
+
+    Check results arrive in 'results' as (tick received timestamp, [(quote key, check results), ...]).
+
+    All other predicate runtime access must run through call() so it runs on the worker thread between checks
+    (the event loop never waits for a lock held during checks)."""
+
+    runtime: Any
+
+    executor: ThreadPoolExecutor = field(
+        default_factory=lambda: ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="predicates"
+        )
+    )
+
+    results: asyncio.Queue[tuple[int, list[tuple[str, list[Any]]]]] = field(
+        default_factory=asyncio.Queue
+    )
+
+    # quote keys updated since the last submitted evaluation (dict for insertion order)
+    pendingKeys: dict[str, None] = field(default_factory=dict)
+    pendingSnapshot: dict[int, Any] = field(default_factory=dict)
+    pendingReceived: int = 0
+
+    running: bool = False
+
+    def submit(
+        self, keys: Iterable[str], snapshot: dict[int, Any], received: int
+    ) -> None:
+        """Schedule checking predicates for 'keys' using 'snapshot' (must run on the event loop)."""
+        self.pendingKeys.update(dict.fromkeys(keys))
+
+        # merged submissions need every slot for all their keys (with the newest values)
+        self.pendingSnapshot = self.pendingSnapshot | snapshot
+
+        # if merging multiple submissions, report latency from the oldest tick
+        if not self.pendingReceived:
+            self.pendingReceived = received
+
+        if not self.running and self.pendingKeys:
+            self.launch()
+
+    def launch(self) -> None:
+        keys = list(self.pendingKeys)
+        snapshot = self.pendingSnapshot
+        received = self.pendingReceived
+
+        self.pendingKeys = {}
+        self.pendingSnapshot = {}
+        self.pendingReceived = 0
+        self.running = True
+
+        fut = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.evaluate, keys, snapshot
+        )
+        fut.add_done_callback(functools.partial(self.finished, received))
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run 'fn' on the worker thread (after any checks already running or queued) and return its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def evaluate(
+        self, keys: list[str], snapshot: dict[int, Any]
+    ) -> list[tuple[str, list[Any]]]:
+        """Check predicates for every key in 'keys' (runs on the worker thread)."""
+        token = EXTRACTOR_SNAPSHOT.set(snapshot)
+        try:
+            return [(key, list(self.runtime.check(key))) for key in keys]
+        finally:
+            EXTRACTOR_SNAPSHOT.reset(token)
+
+    def finished(self, received: int, fut: asyncio.Future) -> None:
+        self.running = False
+
+        try:
+            self.results.put_nowait((received, fut.result()))
+        except Exception:
+            logger.exception("Predicate evaluation failed?")
+
+        if self.pendingKeys:
+            self.launch()
+
+
+@dataclass(slots=True, weakref_slot=True)
 class ITicker:
     """Our own version of a ticker with more composite and self-reporting details."""
 
@@ -785,19 +2037,20 @@ class ITicker:
 
     # just a recentHistoryAnchor price history for every new price update.
     # length assumes we get 4 price updates per second and we want 1 minute of history.
-    history: deque[float] = field(default_factory=lambda: deque(maxlen=60 * 4))
+    history: RollingStats = field(default_factory=lambda: RollingStats(60 * 4))
 
     # hold EMA of instrument price over different time periods.
-    ema: TWEMA = field(default_factory=TWEMA)
+    # (all EMAs are views into our row of the globally shared state.emaStore, populated on instance creation)
+    ema: TWEMA = field(init=False)
 
     # For options, also track some extra fields over time...
-    emaIV: TWEMA = field(default_factory=TWEMA)
-    emaDelta: TWEMA = field(default_factory=TWEMA)
-    emaVega: TWEMA = field(default_factory=TWEMA)
+    emaIV: TWEMA = field(init=False)
+    emaDelta: TWEMA = field(init=False)
+    emaVega: TWEMA = field(init=False)
 
     # ticker stats history
-    emaTradeRate: TWEMA = field(default_factory=TWEMA)
-    emaVolumeRate: TWEMA = field(default_factory=TWEMA)
+    emaTradeRate: TWEMA = field(init=False)
+    emaVolumeRate: TWEMA = field(init=False)
 
     # synthetic ATR using our own accounting.
     # calculate live ATR based on quote updates
@@ -813,9 +2066,20 @@ class ITicker:
     # We want to track the bags so when a leg contract ticks, we update all bag quotes at the same time.
     bags: set[ITicker] = field(default_factory=set)
 
+    # if this is a bag, True when any leg updated since we last calculated our synthetic greeks and quote from legs.
+    # Legs only mark their bags dirty on update, then each bag recalculates at most once per processing pass.
+    legsDirty: bool = True
+
+    # if this is a bag, our most recent synthetic (bid, ask, bidSize, askSize) quote generated from legs
+    legsQuote: tuple[float, float, float, float] = (0, 0, 0, 0)
+
     # if spread, the "width" of the spread (may not be valid for more than 2 legs, but we try)
     width: float | int = 0
 
+    # increments every time our quote data changes (either from our own ticker updating or, for bags, from legs
+    # updating) so readers can tell if anything derived from this ticker is outdated (e.g. cached toolbar rows)
+    revision: int = 0
+
     alerts: dict[int | str, dict[float, tuple[float, float] | None]] = field(
         default_factory=lambda: defaultdict(lambda: defaultdict(None.__class__))
     )
@@ -829,19 +2093,34 @@ class ITicker:
     or30_locked: bool = False       # True after 10:00 ET, prevents further updates
 
     # 'levels' map from a bar duration (2 minute, 5 minute, 30 minute, 1 hour, 1 day, 1 week) to the level records holder
+    # (always modify levels using levelsSet() and levelsEnable() so 'levelIndex' matches enabled 'levels')
     levels: dict[int, LevelBreacher] = field(default_factory=dict)
 
+    # price-sorted index of every level in every enabled LevelBreacher in 'levels'
+    levelIndex: LevelIndex = field(default_factory=LevelIndex)
+
     # just track an estimate of current direction given short-term EMA crossovers (or maybe log scores too)
     prevDirUp: bool | None = None
 
     quoteflow: QuoteFlow = field(default_factory=QuoteFlow)
 
+    # which optional indicator pipelines are updated on each ticker update (managed by IndicatorDemand)
+    # (everything runs until the first demand is applied)
+    indicators: frozenset[str] = TICKER_INDICATORS
+
     created: float = field(default_factory=time.time)
 
     def __post_init__(self):
         assert self.ticker.contract
         self.name = self.state.nameForContract(self.ticker.contract)
 
+        # attach our EMAs to a row of the shared EMA store (and give the row back when we are deleted)
+        store: TWEMAStore = self.state.emaStore
+        row = store.allocate()
+        weakref.finalize(self, store.release, row)
+        for series, name in enumerate(TICKER_EMA_SERIES):
+            setattr(self, name, TWEMA(store, row, series))
+
         # by default, give all instruments a delta=1 greek designation
         # (if the instrument is a live option, this will be overwritten immediately with live data)
         if not isinstance(self.ticker.contract, (Option, FuturesOption)):
@@ -850,11 +2129,34 @@ class ITicker:
         # init ATRs at our default allowances
         # (the .25 is because fully active quotes update in 250 ms intervals, so we normalize "events per second" by update frequency)
         # (ergo, this is a 90 second vs. 45 second ATR)
+        self.atrsReset()
+
+    def atrsReset(self) -> None:
         for lookback in (90, 120, 180, 300, 420, 600, 840, 900, 1260, 1800, 3600):
             self.atrs[lookback] = ATRLive(
                 int(lookback / 0.25), int(lookback / 2 / 0.25)
             )
 
+    def indicatorsSet(self, indicators: frozenset[str]) -> None:
+        """Only update 'indicators' on future ticker updates.
+
+        Newly enabled rolling indicators are reset so they don't combine stale data from before they were
+        disabled with new data. (time-weighted EMAs just resume since they already weight by elapsed time)"""
+        if indicators == self.indicators:
+            return
+
+        enabled = indicators - self.indicators
+        if "atrs" in enabled:
+            self.atrsReset()
+
+        if "quoteflow" in enabled:
+            self.quoteflow = QuoteFlow()
+
+        if "history" in enabled:
+            self.history = RollingStats(self.history.maxlen)
+
+        self.indicators = indicators
+
     def __hash__(self) -> int:
         return hash(self.ticker)
 
@@ -889,29 +2191,8 @@ class ITicker:
 
             # optionally populate bid/ask and size details if current spread isn't getting quotes for some reason
             if bid is None and ask is None:
-                bid = 0
-                ask = 0
-                bidSize = float("inf")
-                askSize = float("inf")
-                for ratio, quote in self.legs:
-                    # if a quote doesn't exist, we need to abandon trying to generate any part of this synthetic quote
-                    # because we don't have all the data we need so just combining partial values would be wrong.
-                    if not (quote and quote.ask and quote.bid):
-                        bid = 0
-                        ask = 0
-                        vwap = nan
-                        bidSize = 0
-                        askSize = 0
-                        usePrice = None
-                        break
-
-                    # SELL legs have opposite signs and positions because they are credits
-                    bid += quote.bid * ratio
-                    ask += quote.ask * ratio
-
-                    # the "quantity" of a spread is the smallest number available for the combinations
-                    bidSize = min(bidSize, quote.askSize)
-                    askSize = min(askSize, quote.bidSize)
+                self.refreshLegs()
+                bid, ask, bidSize, askSize = self.legsQuote
 
         # default: return current values
         return QuoteSizes(bid, ask, bidSize, askSize, last, close)
@@ -954,7 +2235,25 @@ class ITicker:
             return ("区间内", "white")
 
     def processTickerUpdate(self) -> None:
-        """Update data for this ticker and any dependent tickers when we received new data."""
+        """Update data for this ticker and any dependent tickers when we received new data.
+
+        Batch updates should run stageTickerUpdate() for every ticker, then one emaStore.apply(),
+        then completeTickerUpdate() for every ticker, so all EMAs update in a single step."""
+        current = self.stageTickerUpdate()
+        if current is None:
+            return
+
+        for bag in self.bags:
+            bag.refreshLegs()
+
+        self.ema.store.apply()
+        self.completeTickerUpdate(current)
+
+    def stageTickerUpdate(self) -> float | None:
+        """Update everything not depending on EMAs and stage our EMA updates into the EMA store.
+
+        Returns the current price (or None if we have no price and there is nothing else to update)."""
+        self.revision += 1
 
         q = self.quote()
         current = q.current
@@ -963,14 +2262,22 @@ class ITicker:
         if current is None:
             return
 
+        # only update indicators something is actually reading
+        indicators = self.indicators
+
         # log current price update into history...
         # (this also handles updating abandon bag quotes with synthetic quotes from the active legs)
-        self.history.append(current)
+        if "history" in indicators:
+            self.history.append(current)
 
-        for atr in self.atrs.values():
-            atr.update(current)
+        if "atrs" in indicators:
+            for atr in self.atrs.values():
+                atr.update(current)
 
-        self.quoteflow.update(self.ticker.bid, self.ticker.ask, self.ticker.timestamp)
+        if "quoteflow" in indicators:
+            self.quoteflow.update(
+                self.ticker.bid, self.ticker.ask, self.ticker.timestamp
+            )
 
         # IBKR spreads only update high/low values when the exact spread is executed, but we can track
         # more detailed high/lows based on current midpoints as they occur (at least until a restart
@@ -1009,9 +2316,10 @@ class ITicker:
                 self.ticker.low = min(self.ticker.low or float("inf"), q.ask)
                 self.ticker.high = max(self.ticker.high or float("-inf"), q.bid)
 
-        # if we belong to bags, update the greeks inside the bags
+        # if we belong to bags, the greeks and synthetic quotes inside the bags are now outdated
+        # (bags recalculate from all legs once using refreshLegs() instead of once per leg update)
         for bag in self.bags:
-            bag.updateGreeks()
+            bag.legsDirty = True
 
         # update EMAs
         # (one problem we have here: when IBKR sometimes refuses to quote spreads, the spread never gets populated in a
@@ -1019,32 +2327,52 @@ class ITicker:
         #  have to generate it synthetically from the legs for additional EMA updating)
         ts = self.ticker.timestamp
         assert ts
-        self.ema.update(current, ts)
+        if "ema" in indicators:
+            self.ema.stage(current, ts)
+
+        if "emaTradeRate" in indicators:
+            self.emaTradeRate.stage(self.ticker.tradeRate or 0, ts)
+
+        if "emaVolumeRate" in indicators:
+            self.emaVolumeRate.stage(self.ticker.volumeRate or 0, ts)
+
+        # update greeks-specific EMAs because why not?
+        if g := self.ticker.modelGreeks:
+            if "emaIV" in indicators:
+                self.emaIV.stage(g.impliedVol, ts)
+
+            if "emaDelta" in indicators:
+                self.emaDelta.stage(g.delta, ts)
+
+            if "emaVega" in indicators:
+                self.emaVega.stage(g.vega, ts)
+
+        return current
+
+    def completeTickerUpdate(self, current: float) -> None:
+        """Run alerting and tracking which depends on EMAs after our staged EMA updates are applied."""
+        ts = self.ticker.timestamp
+        assert ts
 
         # Update OR30 (Opening Range 30) if within first 30 minutes of market open
         # Market opens at 9:30 ET, OR30 locks at 10:00 ET
         if not self.or30_locked:
-            from datetime import datetime
-            import zoneinfo
-
-            # Get current time in ET
-            et_tz = zoneinfo.ZoneInfo("America/New_York")
-            now_et = datetime.fromtimestamp(ts, tz=et_tz)
+            clock = self.state.sessionClock.update(ts)
 
-            # Check if we're in OR30 window (9:30-10:00 ET)
-            market_open_time = now_et.replace(hour=9, minute=30, second=0, microsecond=0)
-            or30_end_time = now_et.replace(hour=10, minute=0, second=0, microsecond=0)
-
-            if market_open_time <= now_et < or30_end_time:
+            if clock.open <= ts < clock.or30:
                 # Update OR30 high/low during first 30 minutes
                 if self.or30_high is None or current > self.or30_high:
                     self.or30_high = current
                 if self.or30_low is None or current < self.or30_low:
                     self.or30_low = current
-            elif now_et >= or30_end_time:
+            elif ts >= clock.or30:
                 # Lock OR30 after 10:00 ET
                 self.or30_locked = True
 
+        # everything else here is alerting based on EMAs, so there's nothing to check if nobody needs our EMAs
+        if "ema" not in self.indicators:
+            return
+
         name = self.ticker.contract.symbol  # type: ignore
         if isinstance(self.ticker.contract, Future):
             content = ""
@@ -1086,12 +2414,7 @@ class ITicker:
                 content = " ".join([content, prefix, inRangeLow, inRangeHigh]).replace(
                     "  ", " "
                 )
-                self.state.task_create(
-                    content,
-                    self.state.speak.say(
-                        say=content, suppress=60, deadline=time.time() + 5
-                    ),
-                )
+                self.state.alerts.say(content, suppress=60, deadline=time.time() + 5)
 
         # check level breaches for alerting
         # compare against ema 30 second to use as the directional bias anchor
@@ -1107,59 +2430,36 @@ class ITicker:
                     if recentHistoryAnchor > vw and newer < vw:
                         # logger.info("down because: {} > {} and {} < {}", recentHistoryAnchor, vw, newer, vw)
                         content = f"{self.name} VW DOWN"
-                        self.state.task_create(
-                            content,
-                            self.state.speak.say(
-                                say=content, suppress=60, aux=f" @ {vw:.2f}"
-                            ),
-                        )
+                        self.state.alerts.say(content, suppress=60, aux=f" @ {vw:.2f}")
                     elif recentHistoryAnchor < vw and newer > vw:
                         # logger.info("up because: {} < {} and {} > {}", recentHistoryAnchor, vw, newer, vw)
                         content = f"{self.name} VW UP"
-                        self.state.task_create(
-                            content,
-                            self.state.speak.say(
-                                say=content, suppress=60, aux=f" @ {vw:.2f}"
-                            ),
-                        )
+                        self.state.alerts.say(content, suppress=60, aux=f" @ {vw:.2f}")
 
         # TODO: also compare against previous daily high and previous daily low
-        for duration, breacher in self.levels.items():
-            if not breacher.enabled:
-                continue
-
-            for level in breacher.levels:
-                l = level.level
-                if recentHistoryAnchor >= l and newer <= l:
-                    # for SMA, we need to say: SMA DURATION SOURCE (e.g. SMA 5 1-day) but we don't want to say "close 1 day 1 day" if duration and lookback are the same
-                    addendum = (
-                        f", {breacher.durationName}"
-                        if breacher.durationName != level.lookbackName
-                        else ""
-                    )
-                    content = f"{self.name} DOWN {level.levelType} {level.lookbackName}{addendum}"
-                    self.state.task_create(
-                        content, self.state.speak.say(say=content, suppress=60)
-                    )
-                elif recentHistoryAnchor <= l and newer >= l:
-                    addendum = (
-                        f", {breacher.durationName}"
-                        if breacher.durationName != level.lookbackName
-                        else ""
-                    )
-                    content = f"{self.name} UP {level.levelType} {level.lookbackName}{addendum}"
-                    self.state.task_create(
-                        content, self.state.speak.say(say=content, suppress=60)
-                    )
-
-        self.emaTradeRate.update(self.ticker.tradeRate or 0, ts)
-        self.emaVolumeRate.update(self.ticker.volumeRate or 0, ts)
-
-        # update greeks-specific EMAs because why not?
-        if g := self.ticker.modelGreeks:
-            self.emaIV.update(g.impliedVol, ts)
-            self.emaDelta.update(g.delta, ts)
-            self.emaVega.update(g.vega, ts)
+        # Moving down (or not moving) alerts DOWN for levels in [newer, anchor] and moving up alerts UP for levels in [anchor, newer].
+        # (the 'not moving' case only matches levels exactly equal to the price)
+        if (
+            self.levelIndex
+            and newer == newer
+            and recentHistoryAnchor == recentHistoryAnchor
+        ):
+            if recentHistoryAnchor >= newer:
+                direction = "DOWN"
+                crossed = reversed(self.levelIndex.between(newer, recentHistoryAnchor))
+            else:
+                direction = "UP"
+                crossed = iter(self.levelIndex.between(recentHistoryAnchor, newer))
+
+            for breacher, level in crossed:
+                # for SMA, we need to say: SMA DURATION SOURCE (e.g. SMA 5 1-day) but we don't want to say "close 1 day 1 day" if duration and lookback are the same
+                addendum = (
+                    f", {breacher.durationName}"
+                    if breacher.durationName != level.lookbackName
+                    else ""
+                )
+                content = f"{self.name} {direction} {level.levelType} {level.lookbackName}{addendum}"
+                self.state.alerts.say(content, suppress=60)
 
         # logger.info("[{}] EMAs: {}", self.ticker.contract.localSymbol, self.ema)
         if isinstance(self.ticker.contract, (Future, FuturesOption, Option)):
@@ -1174,17 +2474,11 @@ class ITicker:
                     #       being equal reports of DOWN as UP, so we can only report UP (which we tend to care about more anyway).
                     if False and self.ema[60] - self.ema[120] < -0.05:
                         self.prevDirUp = False
-                        self.state.task_create(
-                            "DOWN",
-                            self.state.speak.say(say=f"DOWN {name}", suppress=10),
-                        )
+                        self.state.alerts.say(f"DOWN {name}", suppress=10)
                 else:
                     if self.ema[60] - self.ema[120] > 0.05:
                         self.prevDirUp = True
-                        self.state.task_create(
-                            "UP",
-                            self.state.speak.say(say=f"UP {name}", suppress=10),
-                        )
+                        self.state.alerts.say(f"UP {name}", suppress=10)
 
         # check alert requests for... alerting, I guess.
         baseline = round(self.ema[15], 2)
@@ -1241,6 +2535,61 @@ class ITicker:
                     else:
                         self.alerts[start][r] = (baseline, round(startval * (1 + r), 2))
 
+    def levelsSet(self, breacher: LevelBreacher) -> None:
+        """Attach 'breacher' as our levels for its bar duration (replacing any previous levels for the duration)."""
+        if (previous := self.levels.get(breacher.duration)) and previous.enabled:
+            self.levelIndex.remove(previous)
+
+        self.levels[breacher.duration] = breacher
+
+        if breacher.enabled:
+            self.levelIndex.add(breacher)
+
+    def levelsEnable(self, breacher: LevelBreacher, enabled: bool) -> None:
+        """Enable or disable alerting for all levels of 'breacher'."""
+        if breacher.enabled == enabled:
+            return
+
+        breacher.enabled = enabled
+
+        if enabled:
+            self.levelIndex.add(breacher)
+        else:
+            self.levelIndex.remove(breacher)
+
+    def refreshLegs(self) -> None:
+        """For bags/spreads, recalculate synthetic greeks and quote from legs if any leg updated since the last refresh."""
+        if not self.legsDirty:
+            return
+
+        self.legsDirty = False
+        self.revision += 1
+        self.updateGreeks()
+
+        bid = 0
+        ask = 0
+        bidSize = float("inf")
+        askSize = float("inf")
+        for ratio, quote in self.legs:
+            # if a quote doesn't exist, we need to abandon trying to generate any part of this synthetic quote
+            # because we don't have all the data we need so just combining partial values would be wrong.
+            if not (quote and quote.ask and quote.bid):
+                bid = 0
+                ask = 0
+                bidSize = 0
+                askSize = 0
+                break
+
+            # SELL legs have opposite signs and positions because they are credits
+            bid += quote.bid * ratio
+            ask += quote.ask * ratio
+
+            # the "quantity" of a spread is the smallest number available for the combinations
+            bidSize = min(bidSize, quote.askSize)
+            askSize = min(askSize, quote.bidSize)
+
+        self.legsQuote = (bid, ask, bidSize, askSize)
+
     def updateGreeks(self):
         """For bags/spreads, we calculate greeks for the entire spread by combining greeks for each leg.
 
@@ -2385,7 +3734,10 @@ class CB:
 #       So we want to cache contracts based on their full details so we return different results
 #       for fully qualified contract details versus partial contract details.
 # TODO: though, if we make Contract types immutable, then we could just do id(contract) as a key.
-@cached(cache={}, key=lambda x: x)  # contractToSymbolDescriptor(x))
+@memoized
+@cached(
+    cache=LRUCache(maxsize=8192), key=lambda x: x, info=True
+)  # contractToSymbolDescriptor(x))
 def lookupKey(contract):
     """Given a contract, return something we can use as a lookup key.
 
@@ -2584,6 +3936,515 @@ def split_commands(text):
     return commands
 
 
+@dataclass(slots=True, frozen=True)
+class CommandPlan:
+    """A command request already split into runnable commands, so it can run repeatedly without parsing again.
+
+    'steps' run in order. Each step is (concurrent, commands) where each command is a
+    (command name, arguments, full command text) tuple. Concurrent steps run all their commands at once.
+    """
+
+    text: str
+    steps: tuple[tuple[bool, tuple[tuple[str, tuple[str, ...], str], ...]], ...]
+
+
+# perf_counter_ns() of (tick arrival, predicate firing) for the tick triggering the current predicate action (if any).
+# Set when scheduling predicate commands so tasks created for the command (which copy the current context)
+# can report tick-to-order latency when they place orders.
+TICK_STAMP: contextvars.ContextVar[tuple[int, int] | None] = contextvars.ContextVar(
+    "TICK_STAMP", default=None
+)
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of nanosecond durations.
+
+    Values are bucketed by power of two, then each power of two is split into 2**subBits linear
+    buckets, so every recorded value is accurate within 1/2**subBits (about 3%) of its real value
+    while recording is just some integer math and a list increment."""
+
+    subBits: int = 5
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: int = 0
+    min: int = 0
+    max: int = 0
+
+    def index(self, value: int) -> int:
+        sub = 1 << self.subBits
+        if value < sub:
+            return value
+
+        shift = value.bit_length() - self.subBits - 1
+        return (shift + 1) * sub + (value >> shift) - sub
+
+    def upper(self, index: int) -> int:
+        """Return the largest value stored in bucket 'index'."""
+        sub = 1 << self.subBits
+        if index < sub:
+            return index
+
+        shift, mantissa = divmod(index, sub)
+        return ((mantissa + sub + 1) << (shift - 1)) - 1
+
+    def record(self, value: int) -> None:
+        # (this is index() inlined because recording runs on every ticker update)
+        subBits = self.subBits
+        if value < (1 << subBits):
+            value = value if value > 0 else 0
+            idx = value
+        else:
+            shift = value.bit_length() - subBits - 1
+            idx = ((shift + 1) << subBits) + (value >> shift) - (1 << subBits)
+
+        counts = self.counts
+        try:
+            counts[idx] += 1
+        except IndexError:
+            counts.extend([0] * (idx - len(counts) + 1))
+            counts[idx] += 1
+
+        if value > self.max:
+            self.max = value
+
+        if value < self.min or not self.count:
+            self.min = value
+
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> int:
+        """Return the value at quantile 'q' (0 to 1)."""
+        if not self.count:
+            return 0
+
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self.upper(idx), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def summary(
+        self, quantiles: Iterable[float] = (0.5, 0.9, 0.99, 0.999)
+    ) -> dict[str, float]:
+        """Return count plus min/mean/quantiles/max in microseconds."""
+        return dict(
+            count=self.count,
+            min=self.min / 1_000,
+            mean=self.mean / 1_000,
+            **{f"p{q * 100:g}": self.quantile(q) / 1_000 for q in quantiles},
+            max=self.max / 1_000,
+        )
+
+
+@dataclass(slots=True)
+class LatencyTracker:
+    """Latency histograms for each named stage of a processing pipeline."""
+
+    stages: dict[str, LatencyHistogram] = field(
+        default_factory=lambda: defaultdict(LatencyHistogram)
+    )
+
+    created: float = field(default_factory=time.time)
+
+    def record(self, stage: str, start: int, end: int | None = None) -> int:
+        """Record duration of 'stage' from perf_counter_ns() 'start' to 'end' (or now).
+
+        Returns 'end' so consecutive stages can chain their timestamps."""
+        end = end or time.perf_counter_ns()
+        self.stages[stage].record(end - start)
+        return end
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.created = time.time()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return microsecond summaries of every stage."""
+        return {stage: hist.summary() for stage, hist in sorted(self.stages.items())}
+
+
+@dataclass(slots=True)
+class ToolbarGovernor:
+    """Adapt the toolbar refresh interval to how expensive refreshing currently is.
+
+    Rendering should use at most 'share' of event loop time, so the interval stretches when renders
+    get slower or when the event loop is lagging (meaning ticks and order updates are already waiting
+    behind other work), then shrinks back to the preferred 'interval' once things calm down.
+    """
+
+    # preferred (and minimum) seconds between refreshes
+    interval: float
+
+    # maximum fraction of event loop time we allow for rendering
+    share: float = field(
+        default_factory=lambda: float(os.getenv("ICLI_REFRESH_SHARE", 0.10))
+    )
+
+    # maximum seconds between refreshes no matter how slow rendering gets
+    maximum: float = field(
+        default_factory=lambda: float(os.getenv("ICLI_REFRESH_MAX", 30))
+    )
+
+    # seconds of event loop lag we tolerate before stretching the interval
+    lagBudget: float = 0.05
+
+    # smoothed seconds per render and seconds of event loop lag
+    # (both rise immediately on a new high, but decay over a few refreshes)
+    cost: float = 0.0
+    lag: float = 0.0
+
+    # seconds until the next refresh as of the most recent next()
+    current: float = 0.0
+
+    # non-zero while anything latency-critical is running (no refreshes happen while paused)
+    paused: int = 0
+
+    def __post_init__(self) -> None:
+        self.current = self.interval
+
+    def rendered(self, seconds: float) -> None:
+        self.cost = max(seconds, self.cost * 0.8 + seconds * 0.2)
+
+    def lagged(self, seconds: float) -> None:
+        self.lag = max(seconds, self.lag * 0.8 + seconds * 0.2)
+
+    def next(self) -> float:
+        """Return seconds until the next refresh given current render cost and event loop lag."""
+        wanted = max(self.interval, self.cost / self.share)
+
+        if self.lag > self.lagBudget:
+            wanted *= self.lag / self.lagBudget
+
+        self.current = min(wanted, max(self.maximum, self.interval))
+        return self.current
+
+    @contextlib.contextmanager
+    def pausing(self):
+        """Don't refresh the toolbar while running the body of this context manager."""
+        self.paused += 1
+        try:
+            yield
+        finally:
+            self.paused -= 1
+
+
+@dataclass(slots=True)
+class Pacer:
+    """Token bucket limiting how many requests per second we send (shared by all concurrent senders).
+
+    IBKR disconnects clients sending more than 50 messages per second, so anything sending bulk
+    requests should pace itself below that and leave room for everything else (like orders)."""
+
+    # requests allowed per second (also the largest burst allowed)
+    rate: float
+
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.rate
+
+    async def acquire(self, count: int) -> float:
+        """Wait until we can send 'count' requests. Returns seconds spent waiting."""
+        count = min(count, self.rate)
+        start = time.monotonic()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.rate, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= count:
+                    self.tokens -= count
+                    break
+
+                await asyncio.sleep((count - self.tokens) / self.rate)
+
+        return time.monotonic() - start
+
+
+@dataclass(slots=True)
+class NegativeCache:
+    """Short-lived record of contracts IBKR told us don't exist (bad symbols, strikes, expirations).
+
+    Lookups for known-dead contracts fail immediately instead of making the same round trip again.
+    Entries expire after 'ttl' seconds or when new chain data arrives for their symbol.
+
+    Only contracts IBKR answered with "no security definition" (error 200) are recorded: ib_async
+    ends every failed request with an empty result, so timeouts and pacing errors look the same
+    as missing contracts unless 'requestError()' is attached to the IB error event.
+    """
+
+    ttl: float = field(
+        default_factory=lambda: float(os.getenv("ICLI_DEAD_CONTRACT_TTL", 300))
+    )
+
+    # lookup key -> underlying symbol (so chain refreshes can drop every dead contract for a symbol)
+    dead: TTLCache = field(init=False)
+
+    # id(request contract) -> request contract IBKR reported as undefined (holding the contract keeps its id unique)
+    undefined: LRUCache = field(init=False)
+
+    hits: int = 0
+    misses: int = 0
+
+    def __post_init__(self) -> None:
+        self.dead = TTLCache(maxsize=16_384, ttl=self.ttl)
+        self.undefined = LRUCache(maxsize=4_096)
+
+    @staticmethod
+    def key(contract: Contract, kind: str = "qualify") -> Hashable:
+        """Lookup key for a 'kind' request about 'contract'.
+
+        Keys include where we asked (exchange, primary exchange, currency) because the same symbol
+        can be missing on one exchange and valid on another, and each request 'kind' has its own
+        keys so a failed detail probe never blocks qualifying the bare contract id."""
+        return (
+            kind,
+            contract.conId or contractToSymbolDescriptor(contract),
+            contract.exchange,
+            contract.primaryExchange,
+            contract.currency,
+        )
+
+    def requestError(
+        self, reqId: int, errorCode: int, errorString: str, contract: Contract | None
+    ) -> None:
+        """IB error event handler remembering requests IBKR says have no security definition."""
+        if errorCode == 200 and contract is not None:
+            self.undefined[id(contract)] = contract
+
+    def confirmed(self, contract: Contract) -> bool:
+        """Return whether IBKR reported 'contract' (the object we requested) as undefined."""
+        return self.undefined.pop(id(contract), None) is contract
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key in self.dead:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def add(self, key: Hashable, contract: Contract) -> None:
+        self.dead[key] = contract.symbol
+
+    def discard(self, key: Hashable) -> None:
+        self.dead.pop(key, None)
+
+    def invalidate(self, symbol: str) -> int:
+        """Forget dead contracts for 'symbol' (new chain data may have created them). Returns count removed."""
+        found = [k for k, s in self.dead.items() if s == symbol]
+        for k in found:
+            del self.dead[k]
+
+        return len(found)
+
+    def cache_info(self) -> tuple[int, int, int, int]:
+        return (self.hits, self.misses, int(self.dead.maxsize), len(self.dead))
+
+
+type QualifyResult = Contract | list[Contract] | None
+
+
+@dataclass(slots=True)
+class ContractQualifier:
+    """Qualify contracts with IBKR in concurrent paced batches.
+
+    Concurrent requests for the same contract (by 'key') share one in-flight lookup instead of
+    each asking IBKR again, and contracts IBKR recently failed to resolve (in 'dead') fail immediately.
+
+    Batches run concurrently (each batch waits for 'pacer' before sending), and batch durations
+    are recorded in 'latency' as "qualify:batch".
+    """
+
+    ib: Any
+    pacer: Pacer
+    latency: LatencyTracker
+    dead: NegativeCache
+
+    # contracts per qualifyContractsAsync() request
+    chunk: int = 20
+
+    # lookups currently waiting on IBKR by key
+    inflight: dict[Hashable, asyncio.Future[QualifyResult]] = field(
+        default_factory=dict
+    )
+
+    async def qualify(
+        self, requests: Sequence[tuple[Hashable, Contract]]
+    ) -> list[QualifyResult]:
+        """Return the IBKR qualification result for each (key, contract) in 'requests' in order.
+
+        Results are the same as qualifyContractsAsync(returnAll=True) (qualified contract, list of
+        ambiguous contracts, or None on failure), except results shared from another request are copies.
+        """
+        loop = asyncio.get_running_loop()
+        waits: list[tuple[asyncio.Future[QualifyResult], bool]] = []
+        mine: list[tuple[Hashable, Contract, asyncio.Future[QualifyResult]]] = []
+
+        for key, contract in requests:
+            if fut := self.inflight.get(key):
+                waits.append((fut, True))
+                continue
+
+            fut = loop.create_future()
+            if key in self.dead:
+                fut.set_result(None)
+                waits.append((fut, False))
+                continue
+
+            self.inflight[key] = fut
+            fut.add_done_callback(lambda _, key=key: self.inflight.pop(key, None))
+            waits.append((fut, False))
+            mine.append((key, contract, fut))
+
+        batches = [mine[i : i + self.chunk] for i in range(0, len(mine), self.chunk)]
+        await asyncio.gather(
+            *[self.batch(i, len(batches), b) for i, b in enumerate(batches)]
+        )
+
+        results: list[QualifyResult] = []
+        for fut, shared in waits:
+            # (shield because waiters being canceled must not cancel lookups other requests wait on)
+            got = await asyncio.shield(fut)
+            results.append(copy.copy(got) if shared and got else got)
+
+        return results
+
+    async def batch(
+        self,
+        idx: int,
+        total: int,
+        batch: list[tuple[Hashable, Contract, asyncio.Future[QualifyResult]]],
+    ) -> None:
+        contracts = [c for _, c, _ in batch]
+        got: list[QualifyResult] = []
+        try:
+            paced = await self.pacer.acquire(len(contracts))
+            start = time.perf_counter_ns()
+            got = await asyncio.wait_for(
+                self.ib.qualifyContractsAsync(*contracts, returnAll=True),
+                timeout=min(6, 2 * len(contracts)),
+            )
+
+            self.latency.record("qualify:batch", start)
+
+            # only record contracts IBKR explicitly said don't exist (other request errors also end
+            # with no result, but they don't mean anything about the contract)
+            for (key, contract, _), result in zip(batch, got):
+                if result is None and self.dead.confirmed(contract):
+                    self.dead.add(key, contract)
+            logger.info(
+                "[qualify {}/{}] Qualified {} contracts in {:,.3f} s (paced {:,.3f} s)",
+                idx + 1,
+                total,
+                len(contracts),
+                (time.perf_counter_ns() - start) / 1_000_000_000,
+                paced,
+            )
+        except Exception as e:
+            logger.error(
+                "[qualify {}/{}] Timeout while trying to qualify {} contracts (sometimes IBKR is slow or the API is offline during nightly restarts) :: {}",
+                idx + 1,
+                total,
+                len(contracts),
+                str(e),
+            )
+        finally:
+            # always resolve every lookup (missing results are failures) so nothing waits forever
+            for i, (_, _, fut) in enumerate(batch):
+                if not fut.done():
+                    fut.set_result(got[i] if i < len(got) else None)
+
+
+# last decoded (symbol -> duration -> values) AlgoBinder state (only used inside the decoder process)
+algoDecoderShadow: dict[str, dict[str, Any]] = {}
+
+
+def algoDecoderCreate() -> ProcessPoolExecutor:
+    # (spawn because forking copies our threads and the full application state into the decoder)
+    return ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def algoDecode(
+    msg: bytes | str, tree: dict[str, Any] | None, reset: bool
+) -> dict[str, dict]:
+    """Decode AlgoBinder 'msg' and return only (symbol -> duration -> values) entries which changed since the previous message.
+
+    Runs in the decoder process."""
+    if reset:
+        algoDecoderShadow.clear()
+
+    decoded = ourjson.loads(msg)
+
+    if tree is not None:
+        decoded = AlgoBinder.prune(decoded, tree)
+
+    changes = {}
+    for symbol, durations in decoded.items():
+        previous = algoDecoderShadow.setdefault(symbol, {})
+        if changed := {
+            duration: values
+            for duration, values in durations.items()
+            if previous.get(duration) != values
+        }:
+            previous |= changed
+            changes[symbol] = changed
+
+    return changes
+
+
+class AlgoPath:
+    """Pre-resolved AlgoBinder dotted path.
+
+    Resolves the path once and keeps a reference to the dict holding the final key, so reads are one
+    dict lookup until the AlgoBinder replaces the branch holding that dict (which clears 'container')."""
+
+    __slots__ = ("binder", "keys", "last", "container")
+
+    def __init__(self, binder: AlgoBinder, path: str) -> None:
+        self.binder = binder
+        *self.keys, self.last = path.split(".")
+        self.container: dict | None = None
+
+    def resolve(self) -> dict | None:
+        val = self.binder.data
+        for key in self.keys:
+            if (val := val.get(key)) is None:
+                return None
+
+        if isinstance(val, dict):
+            self.container = val
+            return val
+
+        return None
+
+    def read(self) -> Any | None:
+        if (container := self.container) is None:
+            if (container := self.resolve()) is None:
+                return None
+
+        return container.get(self.last)
+
+    def __call__(self, *args) -> Any | None:
+        return self.read()
+
+
 @dataclass(slots=True)
 class AlgoBinder:
     """Consume an external data feed and save results to a dot-addressable dict hierarchy."""
@@ -2596,6 +4457,110 @@ class AlgoBinder:
     # active websocket connection (if any)
     activeWS: Any | None = None
 
+    # dotted paths read by predicates (see track())
+    paths: set[str] = field(default_factory=set)
+
+    # if enabled, only paths we track are requested from the bar server and merged into 'data'
+    # (requires the bar server to accept {"subscribe": [paths...]} messages, but we also filter locally)
+    subscribe: bool = field(
+        default_factory=lambda: bool(int(os.getenv("ICLI_ALGO_SUBSCRIBE", 0)))
+    )
+
+    # nested dict of 'paths' used for filtering decoded updates (leaf values are None)
+    pathTree: dict[str, Any] = field(default_factory=dict)
+
+    # pending subscription update (referenced so the task isn't garbage collected before it runs)
+    subscriber: asyncio.Task | None = None
+
+    # inbound messages are decoded and diffed in a worker process so the event loop only merges changes
+    # (a process because parsing multi-megabyte JSON holds the GIL, so a thread would still stall the loop)
+    decoder: ProcessPoolExecutor = field(default_factory=lambda: algoDecoderCreate())
+
+    # if True, the decoder process forgets its previous state before decoding the next message
+    decoderReset: bool = True
+
+    # compiled path handles by path
+    handles: dict[str, AlgoPath] = field(default_factory=dict)
+
+    # (symbol, duration) -> handles with a container inside the (symbol, duration) branch
+    # (because each update replaces entire duration branches, those handles must resolve again after an update)
+    branches: dict[tuple[str, str], list[AlgoPath]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+
+    def compile(self, path: str) -> AlgoPath:
+        """Return a reusable handle for reading dotted 'path' (see read() for path format)."""
+        if not (handle := self.handles.get(path)):
+            handle = self.handles[path] = AlgoPath(self, path)
+
+            # paths with 1 or 2 keys read from our top-level or per-symbol dicts which are only ever updated in-place
+            if len(handle.keys) >= 2:
+                self.branches[(handle.keys[0], handle.keys[1])].append(handle)
+
+        return handle
+
+    def track(self, path: str) -> None:
+        """Record 'path' as being read, and if subscribing, update our bar server subscription."""
+        if path in self.paths:
+            return
+
+        self.paths.add(path)
+
+        tree: dict[str, Any] = {}
+        for p in sorted(self.paths):
+            node: dict[str, Any] | None = tree
+            *parents, last = p.split(".")
+            for key in parents:
+                node = node.setdefault(key, {})  # type: ignore
+
+                # if a shorter path already reads all of this level, we already have everything below it
+                if node is None:
+                    break
+            else:
+                node[last] = None  # type: ignore
+
+        self.pathTree = tree
+
+        if self.subscribe and self.activeWS:
+            self.subscriber = asyncio.create_task(self.subscriptionSend(self.activeWS))
+
+    async def subscriptionSend(self, ws) -> None:
+        try:
+            await ws.send(ourjson.dumps(dict(subscribe=sorted(self.paths))))
+        except Exception as e:
+            logger.warning("[Algo Binder] Subscription update failed: {}", e)
+
+    @staticmethod
+    def prune(data: dict[str, Any], tree: dict[str, Any]) -> dict[str, Any]:
+        """Return only the parts of 'data' matching paths in 'tree'."""
+        result = {}
+        for key, subtree in tree.items():
+            if (val := data.get(key)) is None:
+                continue
+
+            if subtree is None:
+                result[key] = val
+            elif isinstance(val, dict) and (pruned := AlgoBinder.prune(val, subtree)):
+                result[key] = pruned
+
+        return result
+
+    async def decode(self, msg: bytes | str) -> dict[str, dict]:
+        """Decode 'msg' in the decoder process and return (symbol -> duration -> values) entries which changed."""
+        # (no tracked paths yet means nothing to filter by, so keep everything instead of dropping everything)
+        tree = self.pathTree if self.subscribe and self.pathTree else None
+
+        reset, self.decoderReset = self.decoderReset, False
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.decoder, algoDecode, msg, tree, reset
+            )
+        except BrokenProcessPool:
+            logger.error("[Algo Binder] Decoder process died, restarting it...")
+            self.decoder = algoDecoderCreate()
+            return await loop.run_in_executor(self.decoder, algoDecode, msg, tree, True)
+
     def read(self, depth: str) -> Any | None:
         """Read something from the saved data in dotted string format.
 
@@ -2611,6 +4576,8 @@ class AlgoBinder:
         Of course, your field names must not include dots in keys anywhere or the entire lookup will break.
 
         If you provide an invalid or non-existing path, the result is None because the depth will fail.
+
+        For repeated reads of the same path, use compile() instead.
         """
 
         val = self.data
@@ -2666,11 +4633,19 @@ class AlgoBinder:
                 self.activeWS = ws
                 logger.info("[Algo Binder :: {}] Connected!", self.url)
 
+                # a new connection sends full state again, so diff against nothing
+                self.decoderReset = True
+
+                if self.subscribe:
+                    await self.subscriptionSend(ws)
+
                 try:
                     # logger.info("Waiting for WS message...")
                     async for msg in ws:
                         # logger.info("Got msg: {:,} bytes", len(msg))
-                        for symbol, durations in ourjson.loads(msg).items():
+                        changes = await self.decode(msg)
+
+                        for symbol, durations in changes.items():
                             # Currently we expect each symbol to have about 8 first-level
                             # durations representing bar sizes in seconds with something like:
                             # 15, 35, 55, 90, 180, 300, 900, 1800
@@ -2680,6 +4655,14 @@ class AlgoBinder:
                             #            so we must MERGE new durations into the symbol for each update.
                             # logger.info("Got data: {} :: {}", symbol, durations)
                             self.data[symbol] |= durations
+
+                            # handles holding replaced duration branches must resolve again
+                            if self.branches:
+                                for duration in durations:
+                                    for handle in self.branches.get(
+                                        (symbol, duration), ()
+                                    ):
+                                        handle.container = None
                 except websockets.ConnectionClosed:
                     # this reconnects the client with an exponential backoff delay
                     # (because websockets library v10 added async reconnect on continue)
@@ -2704,6 +4687,7 @@ class AlgoBinder:
             self.activeWS = None
 
 
+@memoized
 @functools.lru_cache(maxsize=16)
 def convert_time(seconds):
     """Converts the given seconds into a human-readable time format"""
@@ -345,17 +345,33 @@ class IInstrument:
              list (each exchange can have its own "market rules" for required price increments per instrument).
         """
 
+        # don't ask again for contracts IBKR recently told us don't exist
+        dead = db.state.deadContracts
+        key = dead.key(contract, "details")
+        if key in dead:
+            return None
+
         try:
             # Note: this is assuming you are already passing in a very narrow already fully qualified contract.
             # If you attempt to request bulk details from partial or unqualified contracts, this could generate
             # IBKR data pacing exceptions (which is never a good thing).
-            (detail,) = await asyncio.wait_for(
+            details = await asyncio.wait_for(
                 db.ib.reqContractDetailsAsync(contract), timeout=5
             )
         except:
             logger.error("[{}] Failed to find contract details?", contract)
             return None
 
+        if len(details) != 1:
+            # only record contracts IBKR explicitly said don't exist (not timeouts or other request errors)
+            if not details and dead.confirmed(contract):
+                dead.add(key, contract)
+
+            logger.error("[{}] Failed to find contract details?", contract)
+            return None
+
+        (detail,) = details
+
         orderTypes = frozenset(detail.orderTypes.split(","))
 
         priceMagnifier = detail.priceMagnifier
@@ -53,15 +53,33 @@ class ATR:
 
 @dataclass(slots=True)
 class ATRLive:
-    """An ATR but with live trades instead of bars, so it keeps a tiny local history."""
+    """An ATR but with live trades instead of bars, so it keeps a tiny local history.
+
+    The local history is only used for the rolling high/low of the most recent
+    'bufferLength' prices, so instead of holding every price and running max()/min()
+    over the full buffer on each update, we maintain two monotonic deques of
+    (sequence, price) pairs where the extrema are always at the left edge.
+
+    Each price is appended and popped at most once per deque, so updates are
+    amortized O(1) regardless of buffer length (our longest buffers hold 7,200 prices).
+    """
 
     length: int = 20
     bufferLength: int = 55
-    buffer: deque[float] = field(init=False)
+
+    # monotonic deques of (sequence, price) where [0] is always the window high/low
+    highs: deque[tuple[int, float]] = field(init=False)
+    lows: deque[tuple[int, float]] = field(init=False)
+
+    # count of prices received so far (used to expire entries older than 'bufferLength')
+    updated: int = field(init=False, default=0)
+
     atr: ATR = field(init=False)
 
     def __post_init__(self) -> None:
-        self.buffer = deque(maxlen=self.bufferLength)
+        assert self.bufferLength >= 1
+        self.highs = deque()
+        self.lows = deque()
         self.atr = ATR(self.length)
 
     @property
@@ -69,9 +87,38 @@ class ATRLive:
         # passthrough...
         return self.atr.current
 
+    @property
+    def high(self) -> float:
+        return self.highs[0][1]
+
+    @property
+    def low(self) -> float:
+        return self.lows[0][1]
+
     def update(self, price) -> float:
-        self.buffer.append(price)
-        high = max(self.buffer)
-        low = min(self.buffer)
+        seq = self.updated
+        self.updated += 1
+
+        # Drop entries which can never be the window extreme again because the new price
+        # is at least as high (or low) as them *and* will outlive them in the window.
+        highs = self.highs
+        while highs and highs[-1][1] <= price:
+            highs.pop()
+
+        highs.append((seq, price))
+
+        lows = self.lows
+        while lows and lows[-1][1] >= price:
+            lows.pop()
+
+        lows.append((seq, price))
+
+        # expire extremes which fell out of the back of the window
+        expired = seq - self.bufferLength
+        if highs[0][0] <= expired:
+            highs.popleft()
+
+        if lows[0][0] <= expired:
+            lows.popleft()
 
-        return self.atr.update(high, low, price)
+        return self.atr.update(highs[0][1], lows[0][1], price)
@@ -0,0 +1,208 @@
+"""
+Test the contract cache:
+1. Memory tier isolation from objects callers keep modifying
+2. Contract record round trips
+3. Secondary keys pointing to conId records
+4. Record version handling
+5. Migrating pickled contracts
+"""
+
+import tempfile
+import time
+
+import diskcache
+from ib_async import Bag, ComboLeg, Future, FuturesOption, Option, Stock
+
+from icli.helpers import (
+    CONTRACT_RECORD_VERSION,
+    ContractCache,
+    TieredCache,
+    contractDecode,
+    contractEncode,
+)
+
+print("\n" + "=" * 70)
+print("Testing Contract Cache")
+print("=" * 70)
+
+# Test 1: saved objects modified by their callers don't change the cache
+print("\nTest 1: Memory Tier Isolation")
+print("-" * 70)
+
+with tempfile.TemporaryDirectory() as tmp:
+    cache = TieredCache(diskcache.Cache(tmp))
+    fut = Future(conId=5, symbol="ES", exchange="CME", localSymbol="ESZ5")
+    cache.set(5, fut, expire=60)
+
+    # like placeOrderForContract() routing the contract qualify() returned
+    fut.exchange = "IBUSOPT"
+
+    assert cache.get(5).exchange == "CME", f"Memory changed: {cache.get(5)}"
+    assert cache.disk.get(5).exchange == "CME", "Disk changed"
+    assert cache.get(5) is not fut, "Memory holds the caller's object"
+    print("  caller modifying a saved contract doesn't change the cache ✓")
+
+print("\n✅ Test 1 PASSED: Memory tier holds its own copies\n")
+
+# Test 2: contracts decode to what was encoded
+print("\nTest 2: Record Round Trips")
+print("-" * 70)
+
+contracts = [
+    Stock(
+        conId=265598,
+        symbol="AAPL",
+        exchange="SMART",
+        primaryExchange="NASDAQ",
+        currency="USD",
+        localSymbol="AAPL",
+        tradingClass="NMS",
+    ),
+    Option(
+        conId=812345678,
+        symbol="SPY",
+        lastTradeDateOrContractMonth="20251219",
+        strike=600.5,
+        right="C",
+        multiplier="100",
+        exchange="SMART",
+        currency="USD",
+        localSymbol="SPY   251219C00600500",
+        tradingClass="SPY",
+    ),
+    FuturesOption(
+        conId=700000001,
+        symbol="ES",
+        lastTradeDateOrContractMonth="20251219",
+        strike=6000,
+        right="P",
+        multiplier="50",
+        exchange="CME",
+        currency="USD",
+        localSymbol="ESZ5 P6000",
+        tradingClass="ES",
+    ),
+    # fields outside the fixed layout go in the trailing JSON object
+    Future(
+        conId=495512563,
+        symbol="ES",
+        lastTradeDateOrContractMonth="20251219",
+        exchange="CME",
+        currency="USD",
+        localSymbol="ESZ5",
+        description="E-mini S&P 500",
+    ),
+    Bag(
+        symbol="SPY",
+        exchange="SMART",
+        currency="USD",
+        comboLegs=[
+            ComboLeg(conId=1, ratio=1, action="BUY", exchange="SMART"),
+            ComboLeg(conId=2, ratio=1, action="SELL", exchange="SMART"),
+        ],
+    ),
+]
+
+for contract in contracts:
+    record = contractEncode(contract)
+    assert record[0] == CONTRACT_RECORD_VERSION
+    got = contractDecode(record)
+    assert type(got) is type(contract), (type(got), type(contract))
+    assert got == contract, f"{got} != {contract}"
+    print(f"  {type(contract).__name__} round trip ✓")
+
+print("\n✅ Test 2 PASSED: Records decode to the contracts we encoded\n")
+
+# Test 3: every non-conId key only points to the conId record
+print("\nTest 3: Secondary Keys")
+print("-" * 70)
+
+fut = contracts[3]
+
+with tempfile.TemporaryDirectory() as tmp:
+    cache = ContractCache(diskcache.Cache(tmp))
+    cache.set(fut.conId, fut, expire=60)
+    cache.set("ES-FUT-20251219", fut, expire=60)
+
+    assert cache.disk.get(fut.conId) == contractEncode(fut)
+    assert cache.disk.get("ES-FUT-20251219") == fut.conId
+    print("  secondary key stores the conId ✓")
+
+    # a new process starts with an empty memory tier
+    fresh = ContractCache(cache.disk)
+    assert fresh.get("ES-FUT-20251219") == fut
+    assert fresh.get(fut.conId) == fut
+    print("  secondary key resolves through the conId record ✓")
+
+    # caller modifications don't reach the cache
+    fut.exchange = "QBALGO"
+    assert cache.get(fut.conId).exchange == "CME"
+    assert cache.get("ES-FUT-20251219").exchange == "CME"
+    fut.exchange = "CME"
+    print("  memory tier holds copies ✓")
+
+print("\n✅ Test 3 PASSED: Secondary keys point to one record\n")
+
+# Test 4: unknown record versions are cache misses
+print("\nTest 4: Record Versions")
+print("-" * 70)
+
+record = contractEncode(fut)
+future = bytes((CONTRACT_RECORD_VERSION + 1,)) + record[1:]
+assert contractDecode(future) is None
+print("  unknown version decodes to None ✓")
+
+with tempfile.TemporaryDirectory() as tmp:
+    cache = ContractCache(diskcache.Cache(tmp))
+    cache.disk.set(fut.conId, future, expire=60)
+    cache.disk.set("ES-FUT-20251219", fut.conId, expire=60)
+
+    assert cache.get(fut.conId) is None
+    assert cache.get("ES-FUT-20251219") is None
+    assert fut.conId not in cache
+    print("  unknown version records are misses ✓")
+
+print("\n✅ Test 4 PASSED: Unknown record versions are misses\n")
+
+# Test 5: pickled contracts from older caches become records when read
+print("\nTest 5: Pickle Migration")
+print("-" * 70)
+
+with tempfile.TemporaryDirectory() as tmp:
+    disk = diskcache.Cache(tmp)
+    disk.set(fut.conId, fut, expire=600)
+    disk.set("ES-FUT-20251219", fut, expire=300)
+    disk.set("/ES", fut, expire=300)
+
+    cache = ContractCache(disk)
+    assert cache.get(fut.conId) == fut
+    assert disk.get(fut.conId) == contractEncode(fut)
+
+    assert cache.get("ES-FUT-20251219") == fut
+    assert disk.get("ES-FUT-20251219") == fut.conId
+    print("  pickled contracts rewritten as records and pointers ✓")
+
+    # migration keeps each key's original expiration
+    _, expires = disk.get(fut.conId, expire_time=True)
+    assert 590 < expires - time.time() <= 600, expires - time.time()
+    _, expires = disk.get("ES-FUT-20251219", expire_time=True)
+    assert 290 < expires - time.time() <= 300, expires - time.time()
+    print("  original expirations kept ✓")
+
+    # migrating a secondary key must not replace a longer-lived conId record
+    cache = ContractCache(disk)
+    assert cache.get("/ES") == fut
+    _, expires = disk.get(fut.conId, expire_time=True)
+    assert 590 < expires - time.time() <= 600, expires - time.time()
+    print("  existing conId record kept ✓")
+
+    # secondary keys migrated before their conId record create it
+    disk.clear()
+    disk.set("/ES", fut, expire=300)
+    cache = ContractCache(disk)
+    assert cache.get("/ES") == fut
+    assert disk.get(fut.conId) == contractEncode(fut)
+    assert disk.get("/ES") == fut.conId
+    print("  missing conId record created ✓")
+
+print("\n✅ Test 5 PASSED: Pickled contracts migrate without losing records\n")
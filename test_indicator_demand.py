@@ -0,0 +1,132 @@
+"""
+Test indicator demand:
+1. Each consumer maps to the indicators it reads
+2. Commands requesting and withdrawing demand
+"""
+
+from ib_async import Bag, Future, FuturesOption, Index, Option, Stock
+
+from icli.helpers import (
+    COMMAND_INDICATORS,
+    TICKER_INDICATORS,
+    IndicatorDemand,
+    alertIndicators,
+    toolbarIndicators,
+)
+
+PRESETS = ("minimal", "compact", "trading", "scalping", "full")
+
+CONTRACTS = {
+    "stock": Stock("AAPL", "SMART", "USD"),
+    "index": Index("SPX", "CBOE", "USD"),
+    "future": Future("ES", "20251219", "CME"),
+    "option": Option("SPY", "20251219", 600, "C", "SMART"),
+    "fop": FuturesOption("ES", "20251219", 6000, "C", "CME"),
+    "bag": Bag(symbol="SPY"),
+}
+
+print("\n" + "=" * 70)
+print("Testing Indicator Demand")
+print("=" * 70)
+
+# Test 1: consumer -> indicators
+print("\nTest 1: Consumer Indicator Mapping")
+print("-" * 70)
+
+for preset in PRESETS:
+    for name, contract in CONTRACTS.items():
+        got = toolbarIndicators(contract, preset)
+        assert got <= TICKER_INDICATORS, f"Unknown indicators: {got}"
+
+        # rows show EMA trends and VWAP except in the minimal preset
+        assert ("ema" in got) == (preset != "minimal" or name == "bag"), (preset, name)
+
+        # spread rows show history ranges, trading rows for underlyings show ATRs
+        assert ("history" in got) == (name == "bag"), (preset, name)
+        assert ("atrs" in got) == (
+            preset == "trading" and name in {"stock", "index", "future"}
+        ), (preset, name)
+
+print("  toolbar rows by preset and instrument ✓")
+
+# futures run rapid move alerts (EMAs + ATRs), options and spreads run EMA cross and premium alerts
+expected = {
+    "stock": frozenset(),
+    "index": frozenset(),
+    "future": frozenset({"ema", "atrs"}),
+    "option": frozenset({"ema"}),
+    "fop": frozenset({"ema"}),
+    "bag": frozenset({"ema"}),
+}
+
+for name, contract in CONTRACTS.items():
+    assert alertIndicators(contract, False) == expected[name], name
+
+    # VWAP and level breach alerts need EMAs for anything with levels
+    assert "ema" in alertIndicators(contract, True), name
+
+print("  alerts by instrument and levels ✓")
+
+# even the minimal preset (no toolbar EMAs) keeps option and spread alerts running
+for name in ("option", "fop", "bag"):
+    c = CONTRACTS[name]
+    assert "ema" in toolbarIndicators(c, "minimal") | alertIndicators(c, False)
+
+print("  minimal preset keeps option/spread alerts ✓")
+
+for command, indicators in COMMAND_INDICATORS.items():
+    assert indicators <= TICKER_INDICATORS, f"{command}: {indicators}"
+
+# advice and info print quoteflow analysis
+assert "quoteflow" in COMMAND_INDICATORS["advice"]
+assert "quoteflow" in COMMAND_INDICATORS["info"]
+
+# info prints stats for all of these EMAs
+assert {"ema", "emaTradeRate", "emaVolumeRate", "emaIV", "emaDelta"} <= (
+    COMMAND_INDICATORS["info"]
+)
+
+# reporter reports price, trade rate, and volume rate EMAs
+assert {"ema", "emaTradeRate", "emaVolumeRate"} <= COMMAND_INDICATORS["reporter"]
+
+print("  advice, info, and reporter ✓")
+
+print("\n✅ Test 1 PASSED: Every consumer demands what it reads\n")
+
+# Test 2: request() and withdraw()
+print("\nTest 2: Request and Withdraw")
+print("-" * 70)
+
+
+class FakeTicker:
+    """Just the indicator interface of ITicker."""
+
+    def __init__(self) -> None:
+        self.indicators: frozenset[str] = frozenset()
+
+    def indicatorsSet(self, indicators: frozenset[str]) -> None:
+        self.indicators = indicators
+
+
+demand = IndicatorDemand()
+es = FakeTicker()
+quotes = {"/ES": es}
+
+demand.declare("alerts", {"/ES": alertIndicators(CONTRACTS["future"], False)})
+demand.apply(quotes)
+assert es.indicators == {"ema", "atrs"}
+
+fresh = demand.request("reporter /ES", quotes, COMMAND_INDICATORS["reporter"])
+assert fresh == {"/ES": frozenset({"emaTradeRate", "emaVolumeRate"})}, fresh
+assert es.indicators == {"ema", "atrs", "emaTradeRate", "emaVolumeRate"}
+
+# nothing new the second time
+assert not demand.request("reporter /ES", quotes, COMMAND_INDICATORS["reporter"])
+print("  request enables and reports newly enabled indicators ✓")
+
+demand.withdraw("reporter /ES")
+demand.apply(quotes)
+assert es.indicators == {"ema", "atrs"}, es.indicators
+print("  withdraw disables indicators nobody else needs ✓")
+
+print("\n✅ Test 2 PASSED: Commands request and withdraw demand\n")